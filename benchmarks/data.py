@@ -0,0 +1,69 @@
+"""Synthetic data sets for the benchmarks. Everything is generated from a fixed seed so runs are
+comparable. The sizes are part of the file and directory names, so data generated at another
+--scale is never reused.
+"""
+import os
+import numpy as np
+
+
+def write_csv(path, n_rows, n_cols, seed=0):
+    """Write a csv file with a header row, an ascending first column and noisy signal columns
+
+    Parameters
+    ----------
+    path : str
+    n_rows : int
+    n_cols : int
+        number of columns including the x column
+    seed : int, optional
+    """
+    rng = np.random.RandomState(seed)
+    x = np.linspace(0, 100, n_rows)
+    data = np.empty((n_rows, n_cols))
+    data[:, 0] = x
+    for col in range(1, n_cols):
+        data[:, col] = np.sin(x/(5.0+col))*col+rng.normal(scale=0.1, size=n_rows)
+    header = ','.join(['x'] + ['signal %d' % col for col in range(1, n_cols)])
+    np.savetxt(path, data, delimiter=',', header=header, comments='', fmt='%.6g')
+
+
+def many_small(directory, n_files=200, n_rows=500, n_cols=3):
+    """Directory of many small csv files, in a subdirectory named after their sizes. Returns
+    the sorted file paths"""
+    directory = os.path.join(directory, 'small_%dx%dx%d' % (n_files, n_rows, n_cols))
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    paths = []
+    for i in range(n_files):
+        paths.append(os.path.join(directory, 'run%05d.csv' % i))
+        if not os.path.exists(paths[-1]):
+            write_csv(paths[-1], n_rows, n_cols, seed=i)
+    return paths
+
+
+def huge(directory, n_rows=500000, n_cols=3):
+    """A single long csv file, returns its path"""
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    path = os.path.join(directory, 'huge_%dx%d.csv' % (n_rows, n_cols))
+    if not os.path.exists(path):
+        write_csv(path, n_rows, n_cols)
+    return path
+
+
+def wide(directory, n_rows=5000, n_cols=200):
+    """A wide csv file, like a telemetry export, returns its path"""
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    path = os.path.join(directory, 'wide_%dx%d.csv' % (n_rows, n_cols))
+    if not os.path.exists(path):
+        write_csv(path, n_rows, n_cols)
+    return path
+
+
+def series(n_series, n_points, seed=0):
+    """List of [x, y] pairs sharing one x array, in the yset layout"""
+    rng = np.random.RandomState(seed)
+    x = np.linspace(1, 100, n_points)
+    return [[x, np.sin(x/(5.0+i))*(i+1)+rng.normal(scale=0.1, size=n_points)]
+            for i in range(n_series)]
@@ -0,0 +1,37 @@
+"""Time how long importing pubplots takes, compared with importing the heavy dependencies it
+used to load eagerly. Each import runs in a fresh interpreter.
+
+usage: python benchmarks/import_time.py [repeats]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ('pubplots, pubplots.plot', 'import pubplots, pubplots.plot'),
+    ('from pubplots import PlotData', 'from pubplots import PlotData'),
+    ('eager pandas + matplotlib.pyplot',
+     'import pandas, matplotlib; matplotlib.use("Agg"); import matplotlib.pyplot'),
+]
+
+
+def time_import(statement):
+    """Seconds taken by statement in a new interpreter"""
+    code = ('import time; start = time.perf_counter(); %s; '
+            'print(time.perf_counter() - start)' % statement)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.check_output([sys.executable, '-c', code], env=env)
+    return float(output.decode().split()[-1])
+
+
+def main(repeats=5):
+    for name, statement in CASES:
+        times = sorted(time_import(statement) for i in range(repeats))
+        print('%-35s median %7.1f ms  min %7.1f ms' % (name, 1000*times[len(times)//2],
+                                                       1000*times[0]))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
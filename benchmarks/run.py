@@ -0,0 +1,215 @@
+"""Benchmarks for loading, fitting, smoothing and rendering with pubplots.
+
+The results are written as JSON so runs can be compared, e.g. before and after an upgrade
+
+    python benchmarks/run.py -o before.json
+    python benchmarks/run.py -o after.json --compare before.json
+
+Synthetic data is generated once into the data directory, which is reused by later runs.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import data
+import pubplots.plot as pbt
+from pubplots import PlotData
+from pubplots.template import FigureTemplate
+
+
+def new_axes():
+    """A figure and axes on an Agg canvas, without pyplot"""
+    fig = Figure(figsize=(8, 6), facecolor='white')
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot(111)
+
+
+def plotdata_from(yset, yrset=[]):
+    """PlotData holding ready made series"""
+    plotdata = PlotData()
+    plotdata.yset = [list(pair) for pair in yset]
+    plotdata.yrset = [list(pair) for pair in yrset]
+    plotdata.labels = ['series %d' % i for i in range(len(yset))]
+    plotdata.yrlabels = ['right %d' % i for i in range(len(yrset))]
+    plotdata.xaxislabel = 'x'
+    plotdata.yaxislabel = 'y'
+    plotdata.yraxislabel = 'y right'
+    return plotdata
+
+
+def make_cases(datadir, scale, outdir):
+    """The benchmark cases as a list of (name, setup) pairs, setup returns the function to time"""
+    n = lambda count: max(int(count*scale), 1)
+    small = data.many_small(os.path.join(datadir, 'small'), n_files=n(200))
+    huge = data.huge(datadir, n_rows=n(500000))
+    wide = data.wide(datadir, n_rows=n(5000))
+    lines = data.series(5, n(100000))
+    many = data.series(n(200), 2000)
+
+    def load(method, *args, **kwargs):
+        return lambda: getattr(PlotData(), method)(*args, **kwargs)
+
+    def fit(batch):
+        def run():
+            plotdata_from(many).fit(deg=2, batch=batch, verbose=False)
+        return run
+
+    def smooth(window_len):
+        def run():
+            plotdata_from(many).smooth(window_len=window_len)
+        return run
+
+    def quick(method, **kwargs):
+        def run():
+            fig, ax = new_axes()
+            getattr(pbt, method)(ax, plotdata_from(lines[:3], lines[3:4]), **kwargs)
+            fig.canvas.draw()
+        return run
+
+    def label(at_x):
+        yset = data.series(20, n(20000))
+        def run():
+            fig, ax = new_axes()
+            pbt.plot_lines(ax, yset, colors='tb20')
+            pbt.label_lines(ax, yset, at_x=at_x, labels=['series %d' % i for i in range(20)],
+                            colors='tb20', fontsize=10)
+        return run
+
+    def draw_many(function, **kwargs):
+        yset = data.series(n(500), 200)
+        def run():
+            fig, ax = new_axes()
+            getattr(pbt, function)(ax, yset, colors='tb20', **kwargs)
+            fig.canvas.draw()
+        return run
+
+    def template():
+        # the template is built once, each run only replaces the data
+        plotdatas = [plotdata_from(lines[i:i+3], lines[3:4]) for i in range(2)]
+        figure = FigureTemplate(plotdatas[0])
+        def run():
+            for plotdata in plotdatas:
+                figure.update(plotdata)
+                figure.fig.canvas.draw()
+        return run
+
+    def fresh():
+        plotdatas = [plotdata_from(lines[i:i+3], lines[3:4]) for i in range(2)]
+        def run():
+            for plotdata in plotdatas:
+                fig, ax = new_axes()
+                pbt.quick_modern(ax, plotdata)
+                fig.canvas.draw()
+        return run
+
+    def save():
+        fig, ax = new_axes()
+        pbt.quick_modern(ax, plotdata_from(lines[:3]))
+        return lambda: pbt.save_figure(fig, name='bench', outdir=outdir)
+
+    return [
+        ('onefile huge', lambda: load('onefile', huge)),
+        ('onefile wide', lambda: load('onefile', wide, ycols=[1, 2])),
+        ('filelist many small', lambda: load('filelist', small)),
+        ('filelist many small, 4 threads', lambda: load('filelist', small, workers=4)),
+        ('walkandfind many small', lambda: load('walkandfind', os.path.dirname(small[0]),
+                                               search='.csv')),
+        ('fit 200 series', lambda: fit(False)),
+        ('fit 200 series batched', lambda: fit(True)),
+        ('smooth 200 series window 11', lambda: smooth(11)),
+        ('smooth 200 series window 201', lambda: smooth(201)),
+        ('quick_modern', lambda: quick('quick_modern')),
+        ('quick_modern decimated', lambda: quick('quick_modern', decimate=True)),
+        ('quick_semimodern', lambda: quick('quick_semimodern')),
+        ('quick_old_hat', lambda: quick('quick_old_hat')),
+        ('plot_lines 500 series', lambda: draw_many('plot_lines')),
+        ('plot_lines 500 series collection', lambda: draw_many('plot_lines', collection=True)),
+        ('plot_scatter 500 series', lambda: draw_many('plot_scatter')),
+        ('plot_scatter 500 series collection', lambda: draw_many('plot_scatter',
+                                                                 collection=True)),
+        ('quick_modern 2 figures', fresh),
+        ('quick_modern 2 figures template', template),
+        ('label_lines 20 series', lambda: label(None)),
+        ('label_lines 20 series auto', lambda: label('auto')),
+        ('save png+pdf', save),
+    ]
+
+
+def timeit(function, repeats):
+    """Run function repeats times and return the times in seconds"""
+    times = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter()-start)
+    return times
+
+
+def versions():
+    """Versions and machine details stored with the results"""
+    return {'python': platform.python_version(), 'numpy': np.__version__,
+            'pandas': pd.__version__, 'matplotlib': matplotlib.__version__,
+            'platform': platform.platform(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def compare(results, baseline):
+    """Print the change of each benchmark relative to a baseline run"""
+    print('')
+    print('%-36s %10s %10s %8s' % ('benchmark', 'baseline', 'this run', 'ratio'))
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]['median']
+        print('%-36s %9.4fs %9.4fs %7.2fx' % (name, old, result['median'],
+                                              result['median']/old))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-o', '--output', default='benchmark_results.json',
+                        help='JSON file to write the results to')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--datadir', default=os.path.join(tempfile.gettempdir(),
+                                                          'pubplots-benchmark-data'))
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='scale the size of the synthetic data sets')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('-k', '--select', default='',
+                        help='only run benchmarks whose name contains this string')
+    args = parser.parse_args(argv)
+
+    outdir = tempfile.mkdtemp(prefix='pubplots-benchmark-')
+    results = {}
+    for name, setup in make_cases(args.datadir, args.scale, outdir):
+        if args.select not in name:
+            continue
+        times = timeit(setup(), args.repeats)
+        results[name] = {'min': min(times), 'median': sorted(times)[len(times)//2],
+                         'repeats': len(times)}
+        print('%-36s median %9.4fs  min %9.4fs' % (name, results[name]['median'],
+                                                   results[name]['min']))
+    with open(args.output, 'w') as f:
+        json.dump({'versions': versions(), 'scale': args.scale, 'results': results}, f,
+                  indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)['results'])
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,17 @@
-from pubplots.plotdata import PlotData
+"""pubplots loads its heavy dependencies, pandas and matplotlib, on first use so importing the
+package stays fast
+"""
+
+__all__ = ['PlotData']
+
+
+def __getattr__(name):
+    # import PlotData when it is first asked for
+    if name == 'PlotData':
+        from pubplots.plotdata import PlotData
+        return PlotData
+    raise AttributeError("module 'pubplots' has no attribute %r" % name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
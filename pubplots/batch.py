@@ -0,0 +1,219 @@
+"""Render many figures in a pool of worker processes. Each figure is drawn on its own
+matplotlib Figure with the Agg canvas, so no pyplot global state is shared between jobs.
+
+A job is a (data, style, options, name) tuple or a dict with those keys, where data is a
+PlotData object or a file spec, a dict of arguments for PlotData.onefile (with a 'filename'
+key), PlotData.filelist ('files') or PlotData.walkandfind ('startpath'). style is one of
+'modern', 'semimodern' or 'oldhat' and options is a dict passed to the quick plot method.
+"""
+import time
+import traceback
+from multiprocessing import Pool
+from pubplots.plotdata import PlotData
+from pubplots import plot as pbt
+from pubplots.template import FigureTemplate
+
+STYLES = {'modern': pbt.quick_modern, 'semimodern': pbt.quick_semimodern,
+          'oldhat': pbt.quick_old_hat}
+
+# FigureTemplates made by render in this process, by style, options, figsize and data shape
+_TEMPLATES = {}
+
+
+def load_plotdata(spec):
+    """Make a PlotData object from a file spec
+
+    Parameters
+    ----------
+    spec : PlotData or dict
+        dict of arguments for PlotData.onefile if it has a 'filename' key, PlotData.filelist
+        for 'files' or PlotData.walkandfind for 'startpath'. The 'cache' and 'memmap' keys are
+        passed to PlotData()
+
+    Returns
+    -------
+    PlotData object
+    """
+    if isinstance(spec, PlotData):
+        return spec
+    spec = dict(spec)
+    plotdata = PlotData(cache=spec.pop('cache', None), memmap=spec.pop('memmap', None))
+    if 'filename' in spec:
+        plotdata.onefile(**spec)
+    elif 'files' in spec:
+        plotdata.filelist(**spec)
+    elif 'startpath' in spec:
+        plotdata.walkandfind(**spec)
+    else:
+        raise ValueError("A file spec needs one of the keys 'filename', 'files' or 'startpath'")
+    return plotdata
+
+
+def render(data, style='modern', options={}, name='plot', outdir='plots',
+           formats=('png', 'pdf'), dpi=150, figsize=(8, 6), rasterize_above=None,
+           raster_dpi=None, template=False, fit=None):
+    """Draw one figure with a quick plot method and save it
+
+    Parameters
+    ----------
+    data : PlotData or dict
+        the data or a file spec, see load_plotdata
+    style : str, optional
+        one of 'modern', 'semimodern' or 'oldhat'
+    options : dict, optional
+        passed to the quick plot method
+    name : str, optional
+        file name without extension
+    outdir : str, optional
+        directory the figure is saved in
+    formats : list of str, optional
+        file formats to save
+    dpi : int, optional
+    figsize : tuple, optional
+        (width, height) in inches
+    rasterize_above : None or int, optional
+        rasterize the data of dense axes in vector formats, see pubplots.plot.save_figure
+    raster_dpi : None or int, optional
+        resolution of the rasterized data
+    template : bool, optional
+        reuse the figure of an earlier job in this process with the same style, options,
+        figsize and number of series, only replacing its data, see FigureTemplate
+    fit : None or dict, optional
+        fit the yset with PlotData.fit, passing it these arguments like {'deg': 2}, and draw
+        the fits as lines in the colors of their series. Use options={'scatter': True} to
+        show the data as markers
+
+    Returns
+    -------
+    list of str
+        the files written
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    try:
+        quick = STYLES[style]
+    except KeyError:
+        raise ValueError('Incorrect style options are: "modern", "semimodern" and "oldhat"')
+    plotdata = load_plotdata(data)
+    if template and fit is not None:
+        raise ValueError('Fits can not be drawn on a template, the template only updates the '
+                         'series it was built with')
+    if template:
+        key = (style, repr(sorted(options.items())), tuple(figsize),
+               FigureTemplate.shape(plotdata))
+        if key in _TEMPLATES:
+            _TEMPLATES[key].update(plotdata)
+        else:
+            _TEMPLATES[key] = FigureTemplate(plotdata, style, options, figsize)
+        return _TEMPLATES[key].save(name=name, formats=formats, dpi=dpi, outdir=outdir,
+                                    rasterize_above=rasterize_above, raster_dpi=raster_dpi)
+    fig = Figure(figsize=figsize, facecolor='white')
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    quick(ax, plotdata, **options)
+    if fit is not None:
+        draw_fits(ax, plotdata, **fit)
+    return pbt.save_figure(fig, name=name, formats=formats, dpi=dpi, outdir=outdir,
+                           rasterize_above=rasterize_above, raster_dpi=raster_dpi)
+
+
+def draw_fits(ax, plotdata, **kwargs):
+    """Fit the yset of plotdata and draw the fits on the axes of a quick plot, each in the
+    color its series was drawn in
+
+    Parameters
+    ----------
+    ax : matplotlib.axes object
+        the main axes of the quick plot
+    plotdata : PlotData object
+    **kwargs :
+        passed to PlotData.fit, like deg
+
+    Returns
+    -------
+    list of matplotlib.lines.Line2D
+    """
+    kwargs.setdefault('verbose', False)
+    plotdata.fit(**kwargs)
+    fits = plotdata.fits[len(plotdata.fits)-len(plotdata.yset):]
+    colors = [line.get_color() for line in ax.lines[:len(fits)]]
+    if len(colors) < len(fits):
+        # the series were drawn as collections
+        colors = 'black'
+    return pbt.plot_lines(ax, fits, lw=1.5, colors=colors)
+
+
+def _job_kwargs(job):
+    """Turn a (data, style, options, name) tuple or a job dict into render arguments"""
+    if isinstance(job, dict):
+        return dict(job)
+    data, style, options, name = job
+    return {'data': data, 'style': style, 'options': options, 'name': name}
+
+
+def _render_job(job):
+    """Render one job and time it, catching any error so one bad job doesn't stop the batch"""
+    kwargs = _job_kwargs(job)
+    result = {'name': kwargs.get('name', 'plot'), 'outputs': [], 'error': None}
+    start = time.time()
+    try:
+        result['outputs'] = render(**kwargs)
+    except Exception:
+        result['error'] = traceback.format_exc()
+    result['seconds'] = time.time()-start
+    return result
+
+
+def _init_worker():
+    """Make sure workers never start an interactive backend"""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def render_batch(jobs, workers=None, **kwargs):
+    """Render a list of jobs in a pool of worker processes
+
+    Parameters
+    ----------
+    jobs : list
+        (data, style, options, name) tuples or dicts of render arguments
+    workers : None or int, optional
+        number of worker processes, None uses one per cpu. 1 renders in this process
+    **kwargs :
+        defaults for the render arguments of every job, like outdir, formats or dpi
+
+    Returns
+    -------
+    list of dict
+        one result per job in order, with keys 'name', 'outputs', 'seconds' and 'error' which
+        holds the traceback of a failed job or None
+    """
+    jobs = [dict(kwargs, **_job_kwargs(job)) for job in jobs]
+    if workers == 1:
+        return [_render_job(job) for job in jobs]
+    pool = Pool(workers, initializer=_init_worker)
+    try:
+        return list(pool.imap(_render_job, jobs))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def print_report(results):
+    """Print the timing of each job and the errors of the failed ones
+
+    Parameters
+    ----------
+    results : list of dict
+        as returned by render_batch
+    """
+    failed = [result for result in results if result['error'] is not None]
+    for result in results:
+        status = 'failed' if result['error'] is not None else 'ok'
+        print('%-40s %8.3f s  %s' % (result['name'], result['seconds'], status))
+    print('%d jobs, %d failed, %.3f s total' % (len(results), len(failed),
+                                                 sum(result['seconds'] for result in results)))
+    for result in failed:
+        print('')
+        print(result['name'])
+        print(result['error'])
@@ -0,0 +1,174 @@
+"""Contains the FrameCache class, an on-disk cache of parsed DataFrames so unchanged csv files
+don't have to be parsed again by every script that loads them
+"""
+import hashlib
+import os
+
+
+class FrameCache(object):
+
+    """Cache of parsed pandas DataFrames stored as binary pickles in a cache directory. Entries
+    are keyed on the absolute path, size and modification time of the source file together with
+    the arguments passed to pandas.read_csv, so an edited file or a change of arguments is parsed
+    again. The least recently used entries are removed once the cache grows past maxsize.
+
+    Attributes
+    ----------
+    cachedir : str
+        directory the cached frames are written to
+    maxsize : int
+        maximum total size of the cache in bytes
+    """
+
+    suffix = '.pkl'
+
+    def __init__(self, cachedir='.pubplots_cache', maxsize=1024**3):
+        self.cachedir = cachedir
+        self.maxsize = maxsize
+        # running total of the cache size, listed from the directory on the first store
+        self._size = None
+
+    def key(self, filename, header=0, **kwargs):
+        """Make the cache key for a file and the read_csv arguments used to parse it
+
+        Parameters
+        ----------
+        filename : str
+        header : int, optional
+        **kwargs :
+            arguments passed to pandas.read_csv
+
+        Returns
+        -------
+        str
+            hex digest identifying the parsed frame
+        """
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        spec = repr((path, stat.st_size, stat.st_mtime, header, sorted(kwargs.items())))
+        return hashlib.sha1(spec.encode('utf-8')).hexdigest()
+
+    def read_csv(self, filename, header=0, **kwargs):
+        """Return the parsed DataFrame from the cache, or parse the file with pandas.read_csv
+        and store the result
+
+        Parameters
+        ----------
+        filename : str
+        header : int, optional
+        **kwargs :
+            arguments passed to pandas.read_csv
+
+        Returns
+        -------
+        pandas.DataFrame
+        """
+        import pandas as pd
+        path = os.path.join(self.cachedir, self.key(filename, header, **kwargs) + self.suffix)
+        try:
+            frame = pd.read_pickle(path)
+        except (IOError, OSError):
+            frame = None
+        except Exception:
+            # a truncated or corrupt entry, parse the file again and replace it
+            self._remove(path)
+            frame = None
+        if frame is not None:
+            # bump the modification time, it is the access order used for eviction
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+            return frame
+        frame = pd.read_csv(filename, header=header, **kwargs)
+        self.store(path, frame)
+        return frame
+
+    def store(self, path, frame):
+        """Write a frame to the cache and evict old entries if the cache is too big. The size
+        of the cache is kept as a running total, so the directory is only listed again when the
+        total goes over maxsize. Entries written by other processes are counted then
+
+        Parameters
+        ----------
+        path : str
+            the cache file to write
+        frame : pandas.DataFrame
+        """
+        if not os.path.exists(self.cachedir):
+            try:
+                os.makedirs(self.cachedir)
+            except OSError:
+                # created by another worker in the meantime
+                if not os.path.isdir(self.cachedir):
+                    raise
+        # write to a temporary file first so other workers never read a partial entry
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        frame.to_pickle(tmp)
+        if self._size is None:
+            self._size = sum(entry[1] for entry in self.entries())
+        try:
+            # an entry replaced by another worker
+            self._size -= os.stat(path).st_size
+        except OSError:
+            pass
+        os.replace(tmp, path)
+        self._size += os.stat(path).st_size
+        if self._size > self.maxsize:
+            # leave some room, so a full cache isn't listed again on every store
+            self.evict(0.9*self.maxsize)
+
+    def entries(self):
+        """List the cached entries
+
+        Returns
+        -------
+        list of (mtime, size, path) tuples
+            oldest first
+        """
+        entries = []
+        if not os.path.isdir(self.cachedir):
+            return entries
+        for name in os.listdir(self.cachedir):
+            if not name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.cachedir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    def evict(self, limit=None):
+        """Remove the least recently used entries until the cache is smaller than limit
+
+        Parameters
+        ----------
+        limit : None or int, optional
+            size to shrink the cache to in bytes, default is maxsize
+        """
+        if limit is None:
+            limit = self.maxsize
+        entries = self.entries()
+        total = sum(entry[1] for entry in entries)
+        for mtime, size, path in entries:
+            if total <= limit:
+                break
+            self._remove(path)
+            total -= size
+        self._size = total
+
+    def _remove(self, path):
+        """Remove an entry, if it is still there"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove every entry from the cache"""
+        for mtime, size, path in self.entries():
+            self._remove(path)
+        self._size = 0
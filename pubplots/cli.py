@@ -0,0 +1,162 @@
+"""The pubplots command, which renders the plots of a job manifest without a display
+
+    pubplots plots.json -j 4
+
+The manifest is a JSON or YAML (needs PyYAML) file holding a list of jobs, or a dict with the
+list under 'jobs' and the arguments shared by every job under 'defaults'. A job is a dict of
+pubplots.batch.render arguments:
+
+    {"defaults": {"style": "modern", "outdir": "plots", "formats": ["png", "pdf"]},
+     "jobs": [{"name": "delta_g",
+               "data": {"filename": "data/Delta_G_1.csv", "xcol": 0, "ycols": [1, 2],
+                        "labels": ["a", "b"], "xaxislabel": "T"},
+               "options": {"scatter": true},
+               "fit": {"deg": 1}}]}
+
+data is a file spec, see pubplots.batch.load_plotdata. Relative paths in the file specs and
+outdir are relative to the manifest. A job whose outputs are newer than its data files and the
+manifest is skipped, unless --force is given.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# the file spec keys holding paths
+_PATH_KEYS = ('filename', 'files', 'startpath', 'manifest')
+
+
+def read_manifest(path):
+    """Read the jobs of a manifest, with the defaults applied and the relative paths joined to
+    the directory of the manifest
+
+    Parameters
+    ----------
+    path : str
+        a .json, .yaml or .yml file
+
+    Returns
+    -------
+    list of dict
+        render arguments of each job
+    """
+    with open(path) as f:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit('Reading %s needs PyYAML, pip install pyyaml' % path)
+            manifest = yaml.safe_load(f)
+        else:
+            manifest = json.load(f)
+    if isinstance(manifest, list):
+        manifest = {'jobs': manifest}
+    defaults = manifest.get('defaults', {})
+    base = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    for i, job in enumerate(manifest.get('jobs', [])):
+        job = dict(defaults, **job)
+        if 'data' not in job:
+            raise ValueError('Job %d of %s has no data' % (i, path))
+        job.setdefault('name', 'plot%d' % i)
+        job['outdir'] = _relative_to(base, job.get('outdir', 'plots'))
+        data = dict(job['data'])
+        for key in _PATH_KEYS:
+            if key in data:
+                data[key] = _relative_to(base, data[key])
+        job['data'] = data
+        jobs.append(job)
+    return jobs
+
+
+def _relative_to(base, path):
+    """Join relative paths, or lists of them, to base"""
+    if isinstance(path, (list, tuple)):
+        return [_relative_to(base, p) for p in path]
+    return os.path.join(base, path)
+
+
+def outputs(job):
+    """The files a job writes"""
+    return [os.path.join(job['outdir'], job['name'] + '.' + fmt)
+            for fmt in job.get('formats', ('png', 'pdf'))]
+
+
+def inputs(job):
+    """The data files a job reads"""
+    from pubplots.discover import find_files
+    data = job['data']
+    if 'filename' in data:
+        return [data['filename']]
+    if 'files' in data:
+        return list(data['files'])
+    return list(find_files(data['startpath'], search=data.get('search'),
+                           pattern=data.get('pattern'),
+                           regex=data.get('regex'), recursive=data.get('recursive', True)))
+
+
+def up_to_date(job, since=0.0):
+    """True if every output of a job is newer than its data files and since
+
+    Parameters
+    ----------
+    job : dict
+    since : float, optional
+        modification time the outputs have to be newer than too, like that of the manifest
+
+    Returns
+    -------
+    bool
+    """
+    try:
+        newest = max([since]+[os.stat(path).st_mtime for path in inputs(job)])
+        return all(os.stat(path).st_mtime >= newest for path in outputs(job))
+    except (IOError, OSError):
+        return False
+
+
+def main(argv=None):
+    """Run the pubplots command
+
+    Parameters
+    ----------
+    argv : None or list of str, optional
+        command line arguments, default is sys.argv[1:]
+
+    Returns
+    -------
+    int
+        exit status, 1 if any job failed
+    """
+    parser = argparse.ArgumentParser(
+        prog='pubplots', description='Render the plots of a JSON or YAML job manifest')
+    parser.add_argument('manifest', help='JSON or YAML file listing the jobs')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='number of worker processes, default is one per cpu')
+    parser.add_argument('-f', '--force', action='store_true',
+                        help='render every job, even if its outputs are up to date')
+    parser.add_argument('-k', '--select', default=None,
+                        help='only render jobs whose name contains this string')
+    args = parser.parse_args(argv)
+
+    from pubplots.batch import render_batch, print_report
+    start = time.time()
+    jobs = read_manifest(args.manifest)
+    if args.select is not None:
+        jobs = [job for job in jobs if args.select in job['name']]
+    since = os.stat(args.manifest).st_mtime
+    todo = []
+    for job in jobs:
+        if args.force or not up_to_date(job, since):
+            todo.append(job)
+        else:
+            print('%-40s %10s  up to date' % (job['name'], ''))
+    results = render_batch(todo, workers=args.workers) if todo else []
+    print_report(results)
+    print('%d skipped, %.3f s wall time' % (len(jobs)-len(todo), time.time()-start))
+    return 1 if any(result['error'] is not None for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Finding data files in directory trees. Directories are listed with os.scandir and the listings
+can be kept in a Manifest, so directories that haven't changed are not listed again.
+"""
+import fnmatch
+import json
+import os
+import re
+
+
+class Manifest(object):
+
+    """Stat based record of directory listings, saved as a JSON file. A directory whose
+    modification time is unchanged still holds the same entries, so its recorded listing is
+    reused instead of listing it again
+
+    Attributes
+    ----------
+    path : str
+        the JSON file
+    directories : dict
+        directory path to {'mtime': ..., 'files': [...], 'dirs': [...]}
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.directories = {}
+        try:
+            with open(path) as f:
+                self.directories = json.load(f)
+        except (IOError, OSError, ValueError):
+            pass
+
+    def listing(self, directory):
+        """Sorted file and subdirectory names of a directory, from the manifest if it is up to
+        date
+
+        Parameters
+        ----------
+        directory : str
+
+        Returns
+        -------
+        files, dirs : lists of str
+        """
+        mtime = os.stat(directory).st_mtime_ns
+        entry = self.directories.get(directory)
+        if entry is not None and entry['mtime'] == mtime:
+            return entry['files'], entry['dirs']
+        files, dirs = list_directory(directory)
+        self.directories[directory] = {'mtime': mtime, 'files': files, 'dirs': dirs}
+        return files, dirs
+
+    def save(self):
+        """Write the manifest to its JSON file"""
+        tmp = '%s.%d.tmp' % (self.path, os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump(self.directories, f)
+        os.replace(tmp, self.path)
+
+
+def list_directory(directory):
+    """Sorted file and subdirectory names of a directory. Symbolic links to directories are not
+    followed, like os.walk
+
+    Parameters
+    ----------
+    directory : str
+
+    Returns
+    -------
+    files, dirs : lists of str
+    """
+    files = []
+    dirs = []
+    for entry in os.scandir(directory):
+        if entry.is_dir(follow_symlinks=False):
+            dirs.append(entry.name)
+        else:
+            files.append(entry.name)
+    files.sort()
+    dirs.sort()
+    return files, dirs
+
+
+def matches(filename, search=None, pattern=None, regex=None):
+    """Check a file name against the filters, all given filters have to match
+
+    Parameters
+    ----------
+    filename : str
+    search : None or str, optional
+        substring of the name
+    pattern : None or str, optional
+        glob pattern like '*.csv'
+    regex : None, str or compiled regular expression, optional
+        searched for in the name
+
+    Returns
+    -------
+    bool
+    """
+    if search is not None and filename.find(search) == -1:
+        return False
+    if pattern is not None and not fnmatch.fnmatch(filename, pattern):
+        return False
+    if regex is not None and re.search(regex, filename) is None:
+        return False
+    return True
+
+
+def find_files(startpath, search=None, pattern=None, regex=None, recursive=True, manifest=None):
+    """Find files below startpath. Paths are generated as they are found, in sorted order within
+    each directory with the files of a directory before those of its subdirectories, so loading
+    can start before the whole tree is listed
+
+    Parameters
+    ----------
+    startpath : str
+    search : None or str, optional
+        substring of the file names to find
+    pattern : None or str, optional
+        glob pattern of the file names to find like '*.csv'
+    regex : None or str, optional
+        regular expression searched for in the file names
+    recursive : bool, optional
+        look in subdirectories too
+    manifest : None, str or Manifest, optional
+        manifest to reuse directory listings from, a string is the path of its JSON file.
+        It is updated and saved once the search is finished
+
+    Yields
+    ------
+    str
+        path of each file found
+    """
+    if isinstance(manifest, str):
+        manifest = Manifest(manifest)
+    if regex is not None:
+        regex = re.compile(regex)
+    pending = [startpath]
+    while pending:
+        directory = pending.pop()
+        if manifest is None:
+            files, dirs = list_directory(directory)
+        else:
+            files, dirs = manifest.listing(directory)
+        for filename in files:
+            if matches(filename, search, pattern, regex):
+                yield os.path.join(directory, filename)
+        if recursive:
+            # reversed so the subdirectories are popped in sorted order
+            pending += [os.path.join(directory, name) for name in reversed(dirs)]
+    if manifest is not None:
+        manifest.save()
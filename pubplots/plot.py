@@ -6,10 +6,25 @@ Note this is not a wrapper to replace matplolib.
 """
 import os
 import math
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.patches import Rectangle
 from pubplots.colorsmarkers import pubcolors, pubmarkers, pubdashes, TB10
+from pubplots.timing import timed, stage, yset_points, plotdata_points
+
+# plot_scatter draws more points than this as a density map
+DENSITY_ABOVE = 1000000
+
+
+def _pyplot():
+    """Import matplotlib.pyplot on first use, so importing pubplots.plot doesn't start a
+    backend
+
+    Returns
+    -------
+    module
+        matplotlib.pyplot
+    """
+    import matplotlib.pyplot as plt
+    return plt
 
 
 def set_colors(colors):
@@ -109,8 +124,95 @@ def old_hat_style(ax, fontsize=16, grid=False):
         ax.grid(grid, linestyle='--', axis='y', color='0.60')
 
 
+def axes_pixels(ax, dpi=None):
+    """Width of the axes in pixels
+
+    Parameters
+    ----------
+    ax : matplotlib.axes object
+    dpi : None or float, optional
+        resolution the figure will be saved at, default is the figure dpi
+
+    Returns
+    -------
+    int
+    """
+    width = ax.get_position().width*ax.figure.get_figwidth()
+    if dpi is None:
+        dpi = ax.figure.dpi
+    return max(int(math.ceil(width*dpi)), 1)
+
+
+def minmax_decimate(x, y, buckets, ax=None):
+    """Reduce a line to the points that are visible when it is drawn buckets pixels wide. The
+    x range is split into buckets and the first, last, minimum and maximum point of each run of
+    points in a bucket is kept, which draws the same pixels as the full line. NaNs are kept, so
+    the gaps they make in the line stay. Data that can't be converted to floats is returned
+    unchanged.
+
+    Parameters
+    ----------
+    x : array
+        the xdata
+    y : array
+        the ydata
+    buckets : int
+        number of buckets, usually the width of the axes in pixels
+    ax : None or matplotlib.axes object, optional
+        the axes the line is drawn to. The buckets are then spread evenly in its x scale, like
+        a log scale, and over its x limits if they are not autoscaled. Otherwise the buckets
+        span the x range of the data
+
+    Returns
+    -------
+    x, y : arrays
+        the decimated data
+    """
+    try:
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+    except (TypeError, ValueError):
+        return x, y
+    if x.size <= 4*buckets or x.ndim != 1 or x.shape != y.shape:
+        return x, y
+    tx = x
+    if ax is not None:
+        transform = ax.xaxis.get_transform()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tx = transform.transform(x)
+    finite = np.isfinite(tx)
+    if ax is not None and not ax.get_autoscalex_on():
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lo, hi = sorted(transform.transform(np.asarray(ax.get_xlim(), dtype=float)))
+    elif finite.any():
+        lo, hi = tx[finite].min(), tx[finite].max()
+    else:
+        return x, y
+    if not hi > lo:
+        return x, y
+    # pixel column of each point, the points left and right of the view share one column each
+    with np.errstate(invalid='ignore'):
+        column = np.clip(np.floor((tx-lo)/(hi-lo)*buckets), -1, buckets)
+    column[~finite] = np.nan
+    gap = np.isnan(column) | np.isnan(y)
+    # a run of points in one column, a nan is a run of its own as it breaks the line
+    starts = np.flatnonzero(np.r_[True, (column[1:] != column[:-1]) | gap[1:] | gap[:-1]])
+    ends = np.r_[starts[1:], x.size]-1
+    run = np.repeat(np.arange(starts.size), np.diff(np.r_[starts, x.size]))
+    keep = [starts, ends]
+    with np.errstate(invalid='ignore'):
+        for extreme in (np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)):
+            # first index in each run holding the run extreme
+            hits = np.flatnonzero(y == extreme[run])
+            first = np.unique(run[hits], return_index=True)[1]
+            keep.append(hits[first])
+    keep = np.unique(np.concatenate(keep))
+    return x[keep], y[keep]
+
+
+@timed('plot_lines', points=yset_points)
 def plot_lines(ax, yset, lw=2.0, dashes=None, linestyles=['-'], colors='tb10',
-               labels=['none'],**kwargs):
+               labels=['none'], decimate=False, dpi=None, collection=False, **kwargs):
     """plot passed data as lines. Note it uses a ziped set  of lists so the shortest
     list is the maximum number of plots. TB10 just has 10 colors so it will plot a maximum of 10
     lines. For more use 'tb20'
@@ -130,14 +232,30 @@ def plot_lines(ax, yset, lw=2.0, dashes=None, linestyles=['-'], colors='tb10',
         '-' for continuous lines '--' dashed
     colors : str or list of (r,g,b) tupples
         Pass a string options are 'black', 'grey', 'tb10', 'tb20' and 'cb10'(for colorblind people)
+    decimate : bool or int, optional
+        True reduces each line to the min/max points per pixel column of the axes, see
+        minmax_decimate. An int sets the number of pixel columns directly
+    dpi : None or float, optional
+        resolution the figure will be saved at, used to count the pixel columns
+    collection : bool, optional
+        draw all the lines as one LineCollection, which is much quicker to make and draw for
+        hundreds of lines. The returned lines are then empty stand-ins, which ax.legend() shows
+        but LiveLines can't update
     **kwargs : TYPE
-        passed to matplotlib axes.plot()
+        passed to matplotlib axes.plot(), or to the LineCollection
     """
     lines=[]
     if dashes is True:
         dashes=pubdashes
     colors=set_colors(colors)
+    if decimate is True:
+        decimate = axes_pixels(ax, dpi=dpi)
+    if collection:
+        return _line_collection(ax, yset, lw, dashes, linestyles, colors, labels, decimate,
+                                **kwargs)
     for i, data, in enumerate(yset):
+        if decimate:
+            data = minmax_decimate(data[0], data[1], decimate, ax=ax)
         # PLot the dataa
         a, = ax.plot(data[0], data[1], ls=linestyles[i%len(linestyles)],
                      color=colors[i%len(colors)], label=labels[i%len(labels)], lw=lw, **kwargs)
@@ -147,8 +265,41 @@ def plot_lines(ax, yset, lw=2.0, dashes=None, linestyles=['-'], colors='tb10',
     return lines
 
 
+def _line_collection(ax, yset, lw, dashes, linestyles, colors, labels, decimate, **kwargs):
+    """Draw a yset as one LineCollection for plot_lines, returning stand-in Line2D handles"""
+    from matplotlib.collections import LineCollection
+    from matplotlib.lines import Line2D
+    segments = []
+    styles = []
+    for i, data in enumerate(yset):
+        if decimate:
+            data = minmax_decimate(data[0], data[1], decimate, ax=ax)
+        segments.append(np.column_stack([np.asarray(data[0], dtype=float),
+                                         np.asarray(data[1], dtype=float)]))
+        if dashes and i>0:
+            styles.append((0, dashes[i%len(dashes)]))
+        else:
+            styles.append(linestyles[i%len(linestyles)])
+    n = len(segments)
+    lc = LineCollection(segments, colors=[colors[i%len(colors)] for i in range(n)],
+                        linewidths=lw, linestyles=styles, **kwargs)
+    ax.add_collection(lc, autolim=True)
+    ax.autoscale_view()
+    lines = []
+    for i in range(n):
+        line = Line2D([], [], ls=styles[i] if isinstance(styles[i], str) else '-',
+                      color=colors[i%len(colors)], label=labels[i%len(labels)], lw=lw)
+        if not isinstance(styles[i], str):
+            line.set_dashes(styles[i][1])
+        lines.append(line)
+    _add_stand_ins(ax, lines)
+    return lines
+
+
+@timed('plot_scatter', points=yset_points)
 def plot_scatter(ax, yset,  markersize=10, fillstyle='full',
-                 markers=pubmarkers, markeredgewidth=0.0, labels=['none'], colors='tb10'):
+                 markers=pubmarkers, markeredgewidth=0.0, labels=['none'], colors='tb10',
+                 collection=False, density_above=DENSITY_ABOVE, density='hist', bins=200):
     """plot passed data as a scatter plot. Note it uses a ziped set of lists so the shortest
     list is the maximum number of plots. For example colors is currently of length ten.
 
@@ -165,9 +316,30 @@ def plot_scatter(ax, yset,  markersize=10, fillstyle='full',
     markeredgewidth : float, optional, default 0.0
     colors : str or list of (r,g,b) tupples
         Pass a string options are 'black', 'grey', 'tb10', 'tb20' and 'cb10'(for colorblind people)
+    collection : bool, optional
+        draw the markers of all the series sharing a marker and color as one collection, which
+        is much quicker for hundreds of series. Only 'full' and 'none' fillstyles can be drawn
+        this way. The returned markers are then empty stand-ins, which ax.legend() shows but
+        LiveLines can't update
+    density_above : None or int, optional
+        above this many points in total the points are binned and each series is drawn as a
+        density map shaded in its color, see plot_density. None always draws markers
+    density : str, optional
+        'hist' for a 2-D histogram drawn as an image or 'hexbin' for hexagonal bins
+    bins : int, optional
+        number of bins along each axis of the density map
 
     """
     colors=set_colors(colors)
+    if density_above is not None and yset_points(yset) > density_above:
+        return plot_density(ax, yset, bins=bins, kind=density, markers=markers,
+                            labels=labels, colors=colors)
+    if collection and fillstyle not in ('full', 'none'):
+        raise ValueError("Only 'full' and 'none' fillstyles can be drawn with collection=True, "
+                         "got %r" % fillstyle)
+    if collection:
+        return _marker_collection(ax, yset, markersize, fillstyle, markers, markeredgewidth,
+                                  labels, colors)
     scatters=[]
     for i, data in enumerate(yset):
         # PLot the data
@@ -178,6 +350,155 @@ def plot_scatter(ax, yset,  markersize=10, fillstyle='full',
     return scatters
 
 
+def _marker_collection(ax, yset, markersize, fillstyle, markers, markeredgewidth, labels,
+                       colors):
+    """Draw a yset for plot_scatter with one PathCollection per marker and color, holding the
+    points of every series drawn that way. A collection with a single path and color is drawn
+    with the fast marker blitting of axes.plot. Returns stand-in Line2D handles"""
+    from matplotlib.collections import PathCollection
+    from matplotlib.colors import to_rgba
+    from matplotlib.lines import Line2D
+    from matplotlib.markers import MarkerStyle
+    from matplotlib.transforms import IdentityTransform
+    groups = {}
+    scatters = []
+    for i, data in enumerate(yset):
+        marker = markers[i%len(markers)]
+        color = to_rgba(colors[i%len(colors)])
+        groups.setdefault((marker, color), []).append(
+            np.column_stack([np.asarray(data[0], dtype=float), np.asarray(data[1], dtype=float)]))
+        scatters.append(Line2D([], [], linestyle='none', marker=marker, fillstyle=fillstyle,
+                               color=color, markersize=markersize, label=labels[i%len(labels)],
+                               markeredgewidth=markeredgewidth))
+    for (marker, color), offsets in groups.items():
+        style = MarkerStyle(marker)
+        # unfilled markers like 'x' are only drawn by their edge, as axes.plot does
+        face = color if style.is_filled() and fillstyle == 'full' else 'none'
+        # the marker path is in units of the marker size, sizes are areas in points**2
+        pc = PathCollection([style.get_path().transformed(style.get_transform())],
+                            sizes=[markersize**2], offsets=np.concatenate(offsets),
+                            offset_transform=ax.transData, transform=IdentityTransform(),
+                            facecolors=[face], edgecolors=[color],
+                            linewidths=[markeredgewidth])
+        ax.add_collection(pc, autolim=False)
+    if groups:
+        # the limits are updated once, autolim would rescale the axes for every collection
+        ax.update_datalim(np.concatenate([xy for offsets in groups.values() for xy in offsets]))
+        ax.autoscale_view()
+    _add_stand_ins(ax, scatters)
+    return scatters
+
+
+@timed('plot_density', points=yset_points)
+def plot_density(ax, yset, bins=200, kind='hist', markers=pubmarkers, labels=['none'],
+                 colors='tb10'):
+    """plot the density of the points of each series, for scatter plots with too many points to
+    draw as markers. The points are counted in bins with numpy and each series is shaded from
+    pale to full in its color on a log scale, with empty bins left transparent so the series
+    overlap.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes object
+    yset : list
+        list of data to plot like[[x1array, y1array], [x2array, y2array].....].
+    bins : int, optional
+        number of bins along each axis, all series share the same bins
+    kind : str, optional
+        'hist' draws a 2-D histogram as an image, 'hexbin' uses hexagonal bins, rasterized
+        in vector formats
+    markers : str or list of matplotlib markers e.g. ['o','s']
+        used for the legend handles
+    labels : list of str, optional
+    colors : str or list of (r,g,b) tupples
+        Pass a string options are 'black', 'grey', 'tb10', 'tb20' and 'cb10'(for colorblind people)
+
+    Returns
+    -------
+    list of matplotlib.lines.Line2D
+        empty stand-ins for ax.legend()
+    """
+    from matplotlib.colors import LinearSegmentedColormap, LogNorm, to_rgba
+    from matplotlib.lines import Line2D
+    if kind not in ('hist', 'hexbin'):
+        raise ValueError("kind must be 'hist' or 'hexbin'")
+    colors = set_colors(colors)
+    xlog = ax.get_xscale() == 'log'
+    ylog = ax.get_yscale() == 'log'
+    points = []
+    for data in yset:
+        x = np.asarray(data[0], dtype=float)
+        y = np.asarray(data[1], dtype=float)
+        keep = np.isfinite(x) & np.isfinite(y)
+        if xlog:
+            keep &= x > 0
+        if ylog:
+            keep &= y > 0
+        points.append((x[keep], y[keep]))
+    scatters = []
+    xy = [p for p in points if len(p[0])]
+    if not xy:
+        return scatters
+    # shared bin edges, even in log space on log axes
+    xedges = _bin_edges(np.concatenate([p[0] for p in xy]), bins, xlog)
+    yedges = _bin_edges(np.concatenate([p[1] for p in xy]), bins, ylog)
+    for i, (x, y) in enumerate(points):
+        color = to_rgba(colors[i%len(colors)])
+        cmap = LinearSegmentedColormap.from_list(
+            'density', [color[:3]+(0.25,), color[:3]+(1.0,)])
+        cmap.set_bad((0, 0, 0, 0))
+        cmap.set_under((0, 0, 0, 0))
+        scatters.append(Line2D([], [], linestyle='none', marker=markers[i%len(markers)],
+                               color=color, label=labels[i%len(labels)]))
+        if not len(x):
+            continue
+        if kind == 'hexbin':
+            ax.hexbin(x, y, gridsize=bins, cmap=cmap, mincnt=1, bins='log', linewidths=0,
+                      rasterized=True,
+                      xscale='log' if xlog else 'linear', yscale='log' if ylog else 'linear',
+                      # the extent of log scales is given as powers of 10
+                      extent=tuple(_scaled(xedges[[0, -1]], xlog))+
+                      tuple(_scaled(yedges[[0, -1]], ylog)))
+            continue
+        counts, _, _ = np.histogram2d(_scaled(x, xlog), _scaled(y, ylog),
+                                      bins=[_scaled(xedges, xlog), _scaled(yedges, ylog)])
+        counts = np.ma.masked_equal(counts.T, 0)
+        norm = LogNorm(vmin=1, vmax=max(counts.max(), 1))
+        if xlog or ylog:
+            ax.pcolormesh(xedges, yedges, counts, cmap=cmap, norm=norm, rasterized=True)
+        else:
+            ax.imshow(counts, extent=(xedges[0], xedges[-1], yedges[0], yedges[-1]),
+                      origin='lower', aspect='auto', interpolation='nearest', cmap=cmap,
+                      norm=norm)
+    _add_stand_ins(ax, scatters)
+    return scatters
+
+
+def _add_stand_ins(ax, handles):
+    """Add the Line2D stand-ins of series drawn as collections or density maps to ax. They hold
+    no data, so they draw nothing and leave the limits alone, but ax.legend() finds them. They
+    are marked so LiveLines and FigureTemplate can tell them from lines holding the data"""
+    for handle in handles:
+        handle.pubplots_stand_in = True
+        ax.add_line(handle)
+
+
+def _bin_edges(values, bins, log=False):
+    """bins+1 edges spanning values, spaced evenly in log space for a log axis"""
+    lo, hi = values.min(), values.max()
+    if lo == hi:
+        lo, hi = (lo/2, lo*2) if log else (lo-0.5, hi+0.5)
+    if log:
+        return np.geomspace(lo, hi, bins+1)
+    return np.linspace(lo, hi, bins+1)
+
+
+def _scaled(values, log):
+    """values in the space the bins are even in"""
+    return np.log10(values) if log else values
+
+
+@timed('plot_lright', points=yset_points)
 def plot_lright(ax, yset, lw=2.0, yaxlabel='y2', linestyles=['-'],
                 color=TB10[0], fontsize=18, spine=False, **kwargs):
     """plot line to right hand axis. Also colors the right hand labels to of the line and returns
@@ -210,7 +531,8 @@ def plot_lright(ax, yset, lw=2.0, yaxlabel='y2', linestyles=['-'],
     """
     ax.set_zorder(1)
     ax.patch.set_visible(False)
-    axr = ax.twinx()
+    with stage('twinx', ax.figure):
+        axr = ax.twinx()
     axr.set_frame_on(True)
     axr.spines["right"].set_edgecolor(color)
     axr.patch.set_visible(False)
@@ -228,6 +550,7 @@ def plot_lright(ax, yset, lw=2.0, yaxlabel='y2', linestyles=['-'],
     return axr
 
 
+@timed('plot_lright2', points=yset_points)
 def plot_lright2(ax, yset, lw=2.0, yaxlabel='None', color=TB10[3],
                  fontsize=18, linestyles=['-'], spine=False,**kwargs):
     """plot line to displaced right hand axis and returns the axis.
@@ -258,7 +581,8 @@ def plot_lright2(ax, yset, lw=2.0, yaxlabel='None', color=TB10[3],
     matplotlib.axes object
         returns the new right hand axes
     """
-    axr2 = ax.twinx()
+    with stage('twinx', ax.figure):
+        axr2 = ax.twinx()
     axr2.set_frame_on(True)
     axr2.patch.set_visible(False)
     axr2.spines["right"].set_edgecolor(color)
@@ -277,6 +601,7 @@ def plot_lright2(ax, yset, lw=2.0, yaxlabel='None', color=TB10[3],
     return axr2
 
 
+@timed('plot_sright', points=yset_points)
 def plot_sright(ax, yset, markersize=8, fillstyle='full', markers=pubmarkers, yaxlabel='y2',
                 color=TB10[0], fontsize=18, markeredgewidth=0.0, spine=False,
                 **kwargs):
@@ -301,7 +626,8 @@ def plot_sright(ax, yset, markersize=8, fillstyle='full', markers=pubmarkers, ya
     spine : bool, optional
         True - Include the right hand frame spine
     **kwargs : TYPE
-        passed to matplotlib axes.plot()
+        passed to plot_scatter, like density_above to draw more points than that as a
+        density map
 
     Returns
     ----------
@@ -310,7 +636,8 @@ def plot_sright(ax, yset, markersize=8, fillstyle='full', markers=pubmarkers, ya
     """
     ax.set_zorder(1)
     ax.patch.set_visible(False)
-    axr = ax.twinx()
+    with stage('twinx', ax.figure):
+        axr = ax.twinx()
     axr.set_frame_on(True)
     axr.patch.set_visible(False)
     axr.spines["right"].set_edgecolor(color)
@@ -329,6 +656,7 @@ def plot_sright(ax, yset, markersize=8, fillstyle='full', markers=pubmarkers, ya
     return axr
 
 
+@timed('plot_sright2', points=yset_points)
 def plot_sright2(ax , yset, markersize=8, fillstyle='full', markers=pubmarkers, yaxlabel='y3',
                  color=TB10[3], fontsize=18, markeredgewidth=0.0, spine=False,
                  **kwargs):
@@ -353,14 +681,16 @@ def plot_sright2(ax , yset, markersize=8, fillstyle='full', markers=pubmarkers,
     spine : bool, optional
         True - Include the right hand frame spine
     **kwargs : TYPEV
-        passed to matplotlib axes.plot()
+        passed to plot_scatter, like density_above to draw more points than that as a
+        density map
 
     Returns
     ----------
     matplotlib.axes object
         returns the new right hand axes
     """
-    axr2 = ax.twinx()
+    with stage('twinx', ax.figure):
+        axr2 = ax.twinx()
     axr2.set_frame_on(True)
     axr2.patch.set_visible(False)
     axr2.spines["right"].set_edgecolor(color)
@@ -373,7 +703,7 @@ def plot_sright2(ax , yset, markersize=8, fillstyle='full', markers=pubmarkers,
     plot_scatter(axr2, yset, fillstyle=fillstyle, markers=markers,
                  colors=[color], markersize=markersize, markeredgewidth=markeredgewidth, **kwargs)
     axr2.set_ylabel(yaxlabel, color=color, fontsize=fontsize)
-    for tl in axr.get_yticklabels():
+    for tl in axr2.get_yticklabels():
         tl.set_color(color)
     axr2.tick_params(axis="both", which="both", bottom="on", top="off", labelbottom="on",
                      left="off", right="off", labelleft="off", width=2,
@@ -381,6 +711,7 @@ def plot_sright2(ax , yset, markersize=8, fillstyle='full', markers=pubmarkers,
     return axr2
 
 
+@timed('inset_plot')
 def inset_plot(fig, ax, yset, lbwh=[0.58,0.58,0.40,0.40], grid=False, dashes=None,
                xlabel=None, ylabel=None, title=None, fontsize=14, colors='tb10', style='modern',
                scatter=False, label=False, labels=[], at_x=None, linestyles='-', markers=pubmarkers,
@@ -430,6 +761,7 @@ def inset_plot(fig, ax, yset, lbwh=[0.58,0.58,0.40,0.40], grid=False, dashes=Non
     matplotlib.axes object
         returns the new right hand axes
     """
+    from matplotlib.patches import Rectangle
     colors=set_colors(colors)
     rect = Rectangle((lbwh[2]+0.07,lbwh[3]+0.04), lbwh[0]-0.03, lbwh[1]-0.03,
                      facecolor='white', edgecolor='black', transform=fig.transFigure,
@@ -482,6 +814,7 @@ def add_yerrors(ax, yset=None, errors=None, colors='tb10', elinewidth=1.5):
         # Adding labels to the lines
 
 
+@timed('label_lines')
 def label_lines(ax, yset, at_x=None,
                 rotation_on=False,
                 labels=[], offsets=[(0, 0)], colors='tb10', fontsize=18, **kwargs):
@@ -494,8 +827,9 @@ def label_lines(ax, yset, at_x=None,
     yset : list
         list of data to plot like[[x1array, y1array], [x2array, y2array].....].
         x1,y1 are arrays or lists of numbers for plotting
-    at_x : None or list, optional
-        list of x co-cordinates to align the labels with
+    at_x : None, 'auto' or list, optional
+        list of x co-cordinates to align the labels with. 'auto' chooses the positions to
+        avoid overlapping other labels and lines, see auto_label_layout
     rotation_on : bool, optional
         rotate the labels inline with the plotted data
     labels : list, optional
@@ -505,27 +839,287 @@ def label_lines(ax, yset, at_x=None,
     colors : str or list of (r,g,b) tupples
         Pass a string options are 'black', 'grey', 'tb10', 'tb20' and 'cb10'(for colorblind people)
     fontsize : int, optional
+
+    Returns
+    -------
+    list of matplotlib.text.Text
     """
     colors=set_colors(colors)
+    if len(yset) == 0:
+        return []
     if at_x is None:
         at_x = []
         for i, data in enumerate(yset):
             at_x.append(data[0].min()+(i+1)*(data[0].max()-data[0].min())/(len(yset)+1))
-        for i, data in enumerate(yset):
-            label_line(ax, data[0], data[1], labels[i%len(labels)], colors[i%len(colors)],
-                       at_x=at_x[i%len(at_x)],
-                       rotation_on=rotation_on, fontsize=fontsize,
-                       offset=offsets[i%len(offsets)], **kwargs)
+    texts = [labels[i%len(labels)] for i in range(len(yset))]
+    lifts = None
+    if isinstance(at_x, str) and at_x == 'auto':
+        at_x, lifts = auto_label_layout(ax, yset, texts, fontsize=fontsize)
+    positions, rotations = label_positions(ax, yset, at_x, offsets=offsets,
+                                           rotation_on=rotation_on)
+    if lifts is not None:
+        pixels = ax.transData.transform(positions)
+        pixels[:, 1] += lifts
+        positions = ax.transData.inverted().transform(pixels)
+    placed = []
+    for i, pos in enumerate(positions):
+        placed.append(ax.text(pos[0], pos[1], texts[i], size=fontsize, rotation=rotations[i],
+                              color=colors[i%len(colors)], ha="center", va="center",
+                              bbox=dict(ec='1', fc='1'), **kwargs))
+    return placed
+
+
+def auto_label_layout(ax, yset, texts, fontsize=18, candidates=15):
+    """Choose label positions that overlap other labels and lines as little as possible.
+
+    The rendered size of each label is measured once. The lines are rasterised into a coarse
+    occupancy grid over the axes, so the number of line cells a label box would cover is a
+    lookup in a summed area table. Labels are then placed one at a time. Each one tries a set of
+    x positions along its line, on the line and lifted above or below it, and takes the cheapest.
+    The placed boxes are kept in a grid hash so overlap tests only look at nearby labels.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes object
+    yset : list
+        list of data like[[x1array, y1array], [x2array, y2array].....], x ascending
+    texts : list of str
+        the label texts
+    fontsize : int, optional
+    candidates : int, optional
+        number of x positions tried along each line
+
+    Returns
+    -------
+    at_x : list
+        x co-ordinates of the labels
+    lifts : array
+        vertical offset of each label from its line in pixels
+    """
+    from matplotlib.text import Text
+    fig = ax.figure
+    scale = fig.dpi/72.0
+    try:
+        renderer = fig.canvas.get_renderer()
+    except AttributeError:
+        renderer = None
+    pad = 0.6*fontsize*scale  # the white box drawn around each label
+    sizes = np.empty((len(yset), 2))
+    for i, text in enumerate(texts):
+        if renderer is not None:
+            extent = Text(0, 0, text, fontsize=fontsize, figure=fig).get_window_extent(renderer)
+            sizes[i] = (extent.width+pad, extent.height+pad)
+        else:
+            sizes[i] = (0.6*fontsize*scale*len(str(text))+pad, fontsize*scale+pad)
+    # reading the limits applies any pending autoscaling before transData is used
+    ax.get_xlim()
+    ax.get_ylim()
+    xlog = ax.get_xscale() == 'log'
+    ylog = ax.get_yscale() == 'log'
+    box = ax.bbox
+    cell = max(sizes[:, 1].min()/2.0, 4.0)
+    nx = int(math.ceil(box.width/cell))+1
+    ny = int(math.ceil(box.height/cell))+1
+
+    def along(x, fractions):
+        # x positions at fractions of the line length in screen space
+        if xlog:
+            return 10**(np.log10(x[0])+fractions*(np.log10(x[-1])-np.log10(x[0])))
+        return x[0]+fractions*(x[-1]-x[0])
+
+    # rasterise every line into the occupancy grid
+    occupancy = np.zeros((len(yset), ny, nx))
+    for i, data in enumerate(yset):
+        x = np.asarray(data[0])
+        y = np.asarray(data[1])
+        xs = along(x, np.linspace(0, 1, 4*nx))
+        pixels = ax.transData.transform(np.column_stack([xs, _screen_interp(x, y, xs, xlog,
+                                                                             ylog)]))
+        cx = np.floor((pixels[:, 0]-box.x0)/cell)
+        cy = np.floor((pixels[:, 1]-box.y0)/cell)
+        inside = (cx >= 0) & (cx < nx) & (cy >= 0) & (cy < ny)
+        occupancy[i, cy[inside].astype(int), cx[inside].astype(int)] = 1
+    total = occupancy.sum(axis=0)
+
+    fractions = np.linspace(0.05, 0.95, candidates)
+    placed = []
+    index = {}
+    at_x = []
+    lifts = np.zeros(len(yset))
+    for i, data in enumerate(yset):
+        x = np.asarray(data[0])
+        y = np.asarray(data[1])
+        w, h = sizes[i]
+        xs = along(x, fractions)
+        centres = ax.transData.transform(np.column_stack([xs, _screen_interp(x, y, xs, xlog,
+                                                                              ylog)]))
+        options = np.array([0, h, -h, 2*h, -2*h])
+        # every combination of x position and lift
+        cx = np.repeat(centres[:, 0], len(options))
+        cy = np.repeat(centres[:, 1], len(options))+np.tile(options, len(xs))
+        # cover of other lines from the summed area table
+        table = np.zeros((ny+1, nx+1))
+        table[1:, 1:] = (total-occupancy[i]).cumsum(0).cumsum(1)
+        gx0 = np.clip(np.floor((cx-w/2-box.x0)/cell), 0, nx).astype(int)
+        gx1 = np.clip(np.ceil((cx+w/2-box.x0)/cell), 0, nx).astype(int)
+        gy0 = np.clip(np.floor((cy-h/2-box.y0)/cell), 0, ny).astype(int)
+        gy1 = np.clip(np.ceil((cy+h/2-box.y0)/cell), 0, ny).astype(int)
+        cost = table[gy1, gx1]-table[gy0, gx1]-table[gy1, gx0]+table[gy0, gx0]
+        # stay inside the axes, prefer labels on the line and spread along it
+        outside = ((cx-w/2 < box.x0) | (cx+w/2 > box.x1) |
+                   (cy-h/2 < box.y0) | (cy+h/2 > box.y1))
+        cost = cost+1000*outside+2*np.abs(np.tile(options, len(xs)))/h
+        cost += np.abs(np.repeat(fractions, len(options))-(i+1.0)/(len(yset)+1))
+        # overlap with labels already placed, looked up in the grid hash
+        for k in np.argsort(cost, kind='stable'):
+            if cost[k] >= 1000:
+                break
+            near = set()
+            for gx in range(gx0[k], gx1[k]+1):
+                for gy in range(gy0[k], gy1[k]+1):
+                    near.update(index.get((gx, gy), ()))
+            for j in near:
+                ox = min(cx[k]+w/2, placed[j][2])-max(cx[k]-w/2, placed[j][0])
+                oy = min(cy[k]+h/2, placed[j][3])-max(cy[k]-h/2, placed[j][1])
+                if ox > 0 and oy > 0:
+                    cost[k] += 1000*(1+ox*oy/(w*h))
+        best = int(np.argmin(cost))
+        at_x.append(xs[best//len(options)])
+        lifts[i] = options[best%len(options)]
+        placed.append((cx[best]-w/2, cy[best]-h/2, cx[best]+w/2, cy[best]+h/2))
+        for gx in range(gx0[best], gx1[best]+1):
+            for gy in range(gy0[best], gy1[best]+1):
+                index.setdefault((gx, gy), []).append(len(placed)-1)
+    return at_x, lifts
+
+
+def _screen_interp(x, y, at, xlog=False, ylog=False):
+    """Interpolate the line x, y at the positions at, linearly in screen space. Only the
+    neighbouring points of each position are looked up and transformed, so the cost does not
+    grow with the length of the line.
+
+    Parameters
+    ----------
+    x : array
+        the xdata, ascending
+    y : array
+        the ydata
+    at : array
+        x positions to evaluate
+    xlog, ylog : bool, optional
+        the axes are log scaled
+
+    Returns
+    -------
+    array
+        y values at the positions, clamped to the ends of the line like np.interp
+    """
+    at = np.asarray(at, dtype=float)
+    if len(x) == 1:
+        return np.full(at.shape, float(y[0]))
+    i = np.clip(np.searchsorted(x, at), 1, len(x)-1)
+    x0 = x[i-1].astype(float)
+    x1 = x[i].astype(float)
+    y0 = y[i-1].astype(float)
+    y1 = y[i].astype(float)
+    if xlog:
+        x0, x1, at = np.log10(x0), np.log10(x1), np.log10(at)
+    if ylog:
+        y0, y1 = np.log10(y0), np.log10(y1)
+    span = np.where(x1 == x0, 1.0, x1-x0)
+    t = np.clip((at-x0)/span, 0.0, 1.0)
+    value = y0+t*(y1-y0)
+    if ylog:
+        return 10**value
+    return value
+
+
+def label_positions(ax, yset, at_x, offsets=[(0, 0)], rotation_on=False):
+    """Work out where label_lines places the labels. The labels sit where np.interp puts them
+    on each line, the positions and the points used for the slopes of every line are looked
+    up together with one search, and the rotations are found from a single transformation of
+    all the label points to pixels.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes object
+    yset : list
+        list of data like[[x1array, y1array], [x2array, y2array].....], x ascending
+    at_x : list
+        x co-cordinates of the labels
+    offsets : list, optional
+        (x, y) offsets added to the positions in data coordinates
+    rotation_on : bool, optional
+        work out the rotations inline with the data
+
+    Returns
+    -------
+    positions : array
+        (n, 2) array of label positions in data coordinates
+    rotations : array
+        label rotations in degrees
+    """
+    xlog = ax.get_xscale() == 'log'
+    xlim = ax.get_xlim()
+    n = len(yset)
+    at = np.array([float(at_x[i%len(at_x)]) for i in range(n)])
+    if xlog:
+        ahead = 10**(np.log10(at)+(np.log10(xlim[1])-np.log10(xlim[0]))/20.0)
     else:
-        for i, data in enumerate(yset):
-            label_line(ax, data[0], data[1], labels[i%len(labels)], colors[i%len(colors)],
-                       at_x=at_x[i%len(at_x)],
-                       rotation_on=rotation_on, fontsize=fontsize,
-                       offset=offsets[i%len(offsets)], **kwargs)
+        ahead = at+(xlim[1]-xlim[0])/20.0
+    points = np.empty((n, 2, 2))
+    points[:, :, 0] = np.column_stack([at, ahead])
+    points[:, :, 1] = _interp_lines(yset, points[:, :, 0])
+    positions = points[:, 0, :]+np.array([offsets[i%len(offsets)] for i in range(n)],
+                                         dtype=float).reshape(n, 2)
+    rotations = np.zeros(n)
+    if rotation_on is True and n:
+        pixels = ax.transData.transform(points.reshape(-1, 2)).reshape(-1, 2, 2)
+        delta = pixels[:, 1, :]-pixels[:, 0, :]
+        rotations = np.rad2deg(np.arctan2(delta[:, 1], delta[:, 0]))
+    return positions, rotations
+
+
+def _interp_lines(yset, at):
+    """np.interp of each line of a yset at a few positions. Only the neighbouring points of the
+    positions are looked up, so the cost does not grow with the length of the lines
 
+    Parameters
+    ----------
+    yset : list
+        list of data like[[x1array, y1array], [x2array, y2array].....], x ascending
+    at : array
+        (lines, k) x positions for each line
 
+    Returns
+    -------
+    array
+        (lines, k) y values, clamped to the ends of the lines like np.interp
+    """
+    at = np.asarray(at, dtype=float).reshape(len(yset), -1)
+    values = np.empty(at.shape)
+    for i, data in enumerate(yset):
+        x = np.asarray(data[0])
+        y = np.asarray(data[1])
+        last = len(x)-1
+        # the last point at or before each position, kept so it has a point after it
+        i0 = np.clip(np.searchsorted(x, at[i], side='right')-1, 0, max(last-1, 0))
+        i1 = np.minimum(i0+1, last)
+        x0 = x[i0].astype(float)
+        y0 = y[i0].astype(float)
+        gap = x[i1]-x0
+        t = np.clip((at[i]-x0)/np.where(gap == 0, 1.0, gap), 0.0, 1.0)
+        value = y0+t*(y[i1]-y0)
+        # outside a line np.interp gives its end values
+        value = np.where(at[i] < x[0], float(y[0]), value)
+        values[i] = np.where(at[i] >= x[last], float(y[last]), value)
+    return values
+
+
+@timed('quick_modern', points=plotdata_points)
 def quick_modern(ax, plotdata, scatter=False, rscatter=False, grid=True,
-                  r2scatter=False, at_x=None, label=True, fontsize=18):
+                  r2scatter=False, at_x=None, label=True, fontsize=18, decimate=False,
+                  collection=False):
     """Make a modern style plot from a PlotData object
 
     Parameters
@@ -546,6 +1140,11 @@ def quick_modern(ax, plotdata, scatter=False, rscatter=False, grid=True,
     label : bool, optional
         True labels the lines
     fontsize : int, optional
+    decimate : bool or int, optional
+        reduce long lines to their visible min/max points, see plot_lines
+    collection : bool, optional
+        draw the series of each axes as collections, quicker for hundreds of series. See
+        plot_lines and plot_scatter
 
     Returns
     ----------
@@ -559,17 +1158,17 @@ def quick_modern(ax, plotdata, scatter=False, rscatter=False, grid=True,
     if plotdata.yr2set==[] and 1<len(plotdata.yset)<6:
         # Make a colorfule plot using tb5, any right axes data is plotted grey
         if scatter:
-            plot_scatter(ax, plotdata.yset, colors='tb5')
+            plot_scatter(ax, plotdata.yset, colors='tb5', collection=collection)
         else:
-            plot_lines(ax, plotdata.yset, colors='tb5')
+            plot_lines(ax, plotdata.yset, colors='tb5', decimate=decimate, collection=collection)
         if label is True:
             label_lines(ax, plotdata.yset, at_x=at_x, labels=plotdata.labels, colors='tb5')
         if plotdata.yrset!=[]:
             if rscatter:
-                r1 = plot_sright(ax, plotdata.yrset,
+                r1 = plot_sright(ax, plotdata.yrset, collection=collection,
                                     yaxlabel=plotdata.yraxislabel, color=(0.36,0.36,0.39))
             else:
-                r1 = plot_lright(ax, plotdata.yrset,
+                r1 = plot_lright(ax, plotdata.yrset, decimate=decimate, collection=collection,
                     yaxlabel=plotdata.yraxislabel, color=(0.36,0.36,0.39))
             if label is True:
                 label_lines(r1, plotdata.yrset, labels=plotdata.yrlabels, colors=[(0.36,0.36,0.39)]*20)
@@ -577,47 +1176,49 @@ def quick_modern(ax, plotdata, scatter=False, rscatter=False, grid=True,
         # if we have right axes data make a plot where all left axes data is black
         # and right axes data is blue from tb10
         if scatter:
-            plot_scatter(ax, plotdata.yset, colors='black')
+            plot_scatter(ax, plotdata.yset, colors='black', collection=collection)
         else:
-            plot_lines(ax, plotdata.yset, colors='black')
+            plot_lines(ax, plotdata.yset, colors='black', decimate=decimate, collection=collection)
         if label is True:
             label_lines(ax, plotdata.yset, at_x=at_x, labels=plotdata.labels, colors='black')
         if rscatter:
-            r1 = plot_sright(ax, plotdata.yrset,
+            r1 = plot_sright(ax, plotdata.yrset, collection=collection,
                 yaxlabel=plotdata.yraxislabel)
         else:
-            r1 = plot_lright(ax, plotdata.yrset,
+            r1 = plot_lright(ax, plotdata.yrset, decimate=decimate, collection=collection,
                 yaxlabel=plotdata.yraxislabel)
         if label is True:
             label_lines(r1, plotdata.yrset, labels=plotdata.yrlabels, colors=[TB10[0]]*20)
     elif len(plotdata.yset) > 10:
         if scatter:
-            plot_scatter(ax, plotdata.yset, colors='tb20')
+            plot_scatter(ax, plotdata.yset, colors='tb20', collection=collection)
         else:
-            plot_lines(ax, plotdata.yset, colors='tb20')
+            plot_lines(ax, plotdata.yset, colors='tb20', decimate=decimate, collection=collection)
         if label is True:
             label_lines(ax, plotdata.yset, at_x=at_x, labels=plotdata.labels, colors='tb20')
     else:
         if scatter:
-            plot_scatter(ax, plotdata.yset)
+            plot_scatter(ax, plotdata.yset, collection=collection)
         else:
-            plot_lines(ax, plotdata.yset)
+            plot_lines(ax, plotdata.yset, decimate=decimate, collection=collection)
         if label is True:
             label_lines(ax, plotdata.yset, at_x=at_x, labels=plotdata.labels)
     if plotdata.yr2set != []:
         if r2scatter:
-            r2 = plot_sright2(ax, plotdata.yr2set,
+            r2 = plot_sright2(ax, plotdata.yr2set, collection=collection,
                 yaxlabel=plotdata.yr2axislabel)
         else:
-            r2 = plot_lright2(ax,plotdata.yr2set,
+            r2 = plot_lright2(ax,plotdata.yr2set, decimate=decimate, collection=collection,
                 yaxlabel=plotdata.yr2axislabel)
         if label is True:
             label_lines(r2, plotdata.yr2set, labels=plotdata.yr2labels, colors=[TB10[3]]*20)
     return r1, r2
 
 
+@timed('quick_semimodern', points=plotdata_points)
 def quick_semimodern(ax, plotdata, scatter=False, rscatter=False, grid=True,
-                  r2scatter=False, at_x=None, label=True, fontsize=18):
+                  r2scatter=False, at_x=None, label=True, fontsize=18, decimate=False,
+                  collection=False):
     """Make a modern style plot from a PlotData object
 
     Parameters
@@ -638,6 +1239,11 @@ def quick_semimodern(ax, plotdata, scatter=False, rscatter=False, grid=True,
     label : bool, optional
         True labels the lines
     fontsize : int, optional
+    decimate : bool or int, optional
+        reduce long lines to their visible min/max points, see plot_lines
+    collection : bool, optional
+        draw the series of each axes as collections, quicker for hundreds of series. See
+        plot_lines and plot_scatter
 
     Returns
     ----------
@@ -651,63 +1257,65 @@ def quick_semimodern(ax, plotdata, scatter=False, rscatter=False, grid=True,
     if plotdata.yr2set==[] and 1<len(plotdata.yset)<6:
         # Make a colorfule plot using tb5, any right axes data is plotted grey
         if scatter:
-            plot_scatter(ax, plotdata.yset, colors='tb5')
+            plot_scatter(ax, plotdata.yset, colors='tb5', collection=collection)
         else:
-            plot_lines(ax, plotdata.yset, colors='tb5')
+            plot_lines(ax, plotdata.yset, colors='tb5', decimate=decimate, collection=collection)
         if label is True:
             label_lines(ax, plotdata.yset, at_x=at_x, labels=plotdata.labels, colors='tb5')
         if plotdata.yrset!=[]:
             if rscatter:
-                r1 = plot_sright(ax, plotdata.yrset, spine=True,
+                r1 = plot_sright(ax, plotdata.yrset, collection=collection, spine=True,
                                     yaxlabel=plotdata.yraxislabel, color=(0.36,0.36,0.39))
             else:
-                r1 = plot_lright(ax, plotdata.yrset, spine=True,
-                    yaxlabel=plotdata.yraxislabel, color=(0.36,0.36,0.39))
+                r1 = plot_lright(ax, plotdata.yrset, decimate=decimate, collection=collection,
+                    spine=True, yaxlabel=plotdata.yraxislabel, color=(0.36,0.36,0.39))
             if label is True:
                 label_lines(r1, plotdata.yrset, labels=plotdata.yrlabels, colors=[(0.36,0.36,0.39)]*20)
     elif plotdata.yrset != []:
         if scatter:
-            plot_scatter(ax, plotdata.yset, colors='black')
+            plot_scatter(ax, plotdata.yset, colors='black', collection=collection)
         else:
-            plot_lines(ax, plotdata.yset, colors='black')
+            plot_lines(ax, plotdata.yset, colors='black', decimate=decimate, collection=collection)
         if label is True:
             label_lines(ax, plotdata.yset, at_x=at_x, labels=plotdata.labels, colors='black')
         if rscatter:
-            r1 = plot_sright(ax, plotdata.yrset,
+            r1 = plot_sright(ax, plotdata.yrset, collection=collection,
                 yaxlabel=plotdata.yraxislabel, spine=True)
         else:
-            r1 = plot_lright(ax, plotdata.yrset,
+            r1 = plot_lright(ax, plotdata.yrset, decimate=decimate, collection=collection,
                 yaxlabel=plotdata.yraxislabel, spine=True)
         if label is True:
             label_lines(r1, plotdata.yrset, labels=plotdata.yrlabels, colors=[TB10[0]]*20)
     elif len(plotdata.yset) > 10:
         if scatter:
-            plot_scatter(ax, plotdata.yset, colors='tb20')
+            plot_scatter(ax, plotdata.yset, colors='tb20', collection=collection)
         else:
-            plot_lines(ax, plotdata.yset, colors='tb20')
+            plot_lines(ax, plotdata.yset, colors='tb20', decimate=decimate, collection=collection)
         if label is True:
             label_lines(ax, plotdata.yset, at_x=at_x, labels=plotdata.labels, colors='tb20')
     else:
         if scatter:
-            plot_scatter(ax, plotdata.yset)
+            plot_scatter(ax, plotdata.yset, collection=collection)
         else:
-            plot_lines(ax, plotdata.yset)
+            plot_lines(ax, plotdata.yset, decimate=decimate, collection=collection)
         if label is True:
             label_lines(ax, plotdata.yset, at_x=at_x, labels=plotdata.labels)
     if plotdata.yr2set != []:
         if r2scatter:
-            r2 = plot_sright2(ax, plotdata.yr2set,
+            r2 = plot_sright2(ax, plotdata.yr2set, collection=collection,
                 yaxlabel=plotdata.yr2axislabel, spine=True)
         else:
-            r2 = plot_lright2(ax,plotdata.yr2set,
+            r2 = plot_lright2(ax,plotdata.yr2set, decimate=decimate, collection=collection,
                 yaxlabel=plotdata.yr2axislabel, spine=True)
         if label is True:
             label_lines(r2, plotdata.yr2set, labels=plotdata.yr2labels, colors=[TB10[3]]*20)
     return r1, r2
 
 
+@timed('quick_old_hat', points=plotdata_points)
 def quick_old_hat(ax, plotdata, scatter=False, rscatter=False,
-                  r2scatter=False, at_x=None, label=True, fontsize=18, dashes=False):
+                  r2scatter=False, at_x=None, label=True, fontsize=18, dashes=False,
+                  decimate=False, collection=False):
     """Make a modern style plot from a PlotData object
 
     Parameters
@@ -730,6 +1338,11 @@ def quick_old_hat(ax, plotdata, scatter=False, rscatter=False,
     fontsize : int, optional
     dashes : None, optional
         True - adds varying dashes
+    decimate : bool or int, optional
+        reduce long lines to their visible min/max points, see plot_lines
+    collection : bool, optional
+        draw the series of each axes as collections, quicker for hundreds of series. See
+        plot_lines and plot_scatter
 
     Returns
     ----------
@@ -742,33 +1355,35 @@ def quick_old_hat(ax, plotdata, scatter=False, rscatter=False,
     r2 = None
     if plotdata.yrset != []:
         if scatter:
-            plot_scatter(ax, plotdata.yset, colors='black')
+            plot_scatter(ax, plotdata.yset, colors='black', collection=collection)
         else:
-            plot_lines(ax, plotdata.yset, colors='black', dashes=dashes)
+            plot_lines(ax, plotdata.yset, colors='black', dashes=dashes, decimate=decimate,
+                       collection=collection)
         if label is True:
             label_lines(ax, plotdata.yset, at_x=at_x, labels=plotdata.labels, colors='black')
         if rscatter:
-            r1 = plot_sright(ax, plotdata.yrset,
+            r1 = plot_sright(ax, plotdata.yrset, collection=collection,
                 yaxlabel=plotdata.yraxislabel, spine=True, color=(0.35,0.35,0.39))
         else:
-            r1 = plot_lright(ax, plotdata.yrset,
+            r1 = plot_lright(ax, plotdata.yrset, decimate=decimate, collection=collection,
                 yaxlabel=plotdata.yraxislabel, spine=True, color=(0.35,0.35,0.39))
         if label is True:
             label_lines(r1, plotdata.yrset, labels=plotdata.yrlabels, colors=[(0.35,0.35,0.39)]*20)
     else:
         if scatter:
-            plot_scatter(ax, plotdata.yset, colors='black')
+            plot_scatter(ax, plotdata.yset, colors='black', collection=collection)
         else:
-            plot_lines(ax, plotdata.yset, dashes=dashes, colors='black')
+            plot_lines(ax, plotdata.yset, dashes=dashes, colors='black', decimate=decimate,
+                       collection=collection)
         if label is True:
             label_lines(ax, plotdata.yset, at_x=at_x, labels=plotdata.labels, colors='black')
     if plotdata.yr2set != []:
         if r2scatter:
-            r2 = plot_sright2(ax, plotdata.yr2set,
+            r2 = plot_sright2(ax, plotdata.yr2set, collection=collection,
                 yaxlabel=plotdata.yr2axislabel,
                 color=(0.65,0.55,0.55), spine=True)
         else:
-            r2 = plot_lright2(ax,plotdata.yr2set,
+            r2 = plot_lright2(ax,plotdata.yr2set, decimate=decimate, collection=collection,
                 yaxlabel=plotdata.yr2axislabel,
                 color=(0.65,0.55,0.55), spine=True)
         if label is True:
@@ -776,19 +1391,235 @@ def quick_old_hat(ax, plotdata, scatter=False, rscatter=False,
     return r1, r2
 
 
-def save(name='plot'):
+def save(name='plot', fig=None, formats=('png', 'pdf'), dpi=150, outdir='plots',
+         rasterize_above=None, raster_dpi=None):
     """save as png and pdf
 
     Parameters
     ----------
     name : str, optional
         file name
+    fig : None or matplotlib.figure object, optional
+        figure to save, default is the current pyplot figure
+    formats : list of str, optional
+    dpi : int, optional
+    outdir : str, optional
+        directory to save to, created if needed
+    rasterize_above : None or int, optional
+        rasterize the data of axes plotting more points than this in vector formats, see
+        save_figure
+    raster_dpi : None or int, optional
+        resolution of the rasterized data, default is dpi
+
+    Returns
+    -------
+    list of str
+        the files written
+    """
+    if fig is None:
+        fig = _pyplot().gcf()
+    return save_figure(fig, name=name, formats=formats, dpi=dpi, outdir=outdir,
+                       rasterize_above=rasterize_above, raster_dpi=raster_dpi)
+
+
+# formats where rasterize_above has an effect
+VECTOR_FORMATS = ('pdf', 'svg', 'svgz', 'eps', 'ps')
+
+
+@timed('save_figure')
+def save_figure(fig, name='plot', formats=('png', 'pdf'), dpi=150, outdir='plots',
+                pad_inches=0.1, rasterize_above=None, raster_dpi=None):
+    """Save a figure in several formats. The tight bounding box of the raster formats is
+    computed once for each dpi and reused, instead of savefig working it out for each file.
+
+    Dense data makes huge, slow vector files with one path per marker. With rasterize_above the
+    lines and collections of every axes plotting more points than that are drawn as an image
+    in the vector formats, while the axes, tick labels, line labels and other text stay vector.
+
+    Parameters
+    ----------
+    fig : matplotlib.figure object
+    name : str, optional
+        file name without extension
+    formats : list of str, optional
+        file formats, e.g. ['png', 'pdf', 'svg']
+    dpi : int, optional
+    outdir : str, optional
+        directory to save to, created if needed
+    pad_inches : float, optional
+        padding around the tight bounding box
+    rasterize_above : None or int, optional
+        number of points an axes has to plot for its data to be rasterized, None keeps all the
+        data vector
+    raster_dpi : None or int, optional
+        resolution of the rasterized data in vector formats, default is dpi
+
+    Returns
+    -------
+    list of str
+        the files written
+    """
+    if not os.path.exists(outdir):
+        os.makedirs(outdir)
+    rasterized = []
+    if rasterize_above is not None:
+        for ax in fig.axes:
+            artists = list(ax.lines)+list(ax.collections)
+            if sum(_artist_points(artist) for artist in artists) > rasterize_above:
+                rasterized += [(artist, artist.get_rasterized()) for artist in artists]
+    outputs = []
+    # one bounding box per resolution the raster files are saved at
+    bboxes = {}
+    try:
+        for fmt in formats:
+            outputs.append(os.path.join(outdir, name + '.' + fmt))
+            vector = fmt in VECTOR_FORMATS
+            for artist, state in rasterized:
+                artist.set_rasterized(vector or state)
+            save_dpi = (raster_dpi or dpi) if vector else dpi
+            if vector:
+                # the text of vector files is measured by their own renderer, so savefig works
+                # out their bounding box
+                bbox = 'tight'
+            else:
+                if save_dpi not in bboxes:
+                    bboxes[save_dpi] = _tight_bbox(fig, save_dpi, pad_inches)
+                bbox = bboxes[save_dpi]
+            fig.savefig(outputs[-1], dpi=save_dpi, bbox_inches=bbox, pad_inches=pad_inches)
+    finally:
+        for artist, state in rasterized:
+            artist.set_rasterized(state)
+    return outputs
+
+
+def _tight_bbox(fig, dpi, pad_inches):
+    """The padded tight bounding box of a figure drawn at dpi, as savefig works it out, or
+    'tight' if the canvas can't lend a renderer"""
+    original = fig.dpi
+    fig.dpi = dpi
+    try:
+        if hasattr(fig, 'draw_without_rendering'):
+            fig.draw_without_rendering()
+        else:
+            fig.canvas.draw()
+        renderer = fig.canvas.get_renderer()
+        return fig.get_tightbbox(renderer).padded(pad_inches)
+    except AttributeError:
+        return 'tight'
+    finally:
+        fig.dpi = original
+
+
+def _artist_points(artist):
+    """Number of points drawn by a line or collection"""
+    if hasattr(artist, 'get_xydata'):
+        return len(artist.get_xydata())
+    if hasattr(artist, 'get_segments'):
+        return sum(len(segment) for segment in artist.get_segments())
+    offsets = artist.get_offsets()
+    if len(offsets) > 1:
+        return len(offsets)
+    return sum(len(path.vertices) for path in artist.get_paths())
+
+
+class LiveLines(object):
+
+    """Keep the lines returned by plot_lines or plot_scatter up to date with data that is
+    growing, for example a PlotData following a log file. The lines are updated in place and
+    redrawn by blitting them onto a saved background, the axes are only redrawn when the data
+    leaves the current view. Call stop() before saving the figure, animated lines are left out of
+    saved files.
+
+    Attributes
+    ----------
+    lines : list of matplotlib.lines.Line2D
+    blit : bool
+        blit the lines when the canvas supports it
     """
-    if not os.path.exists("plots"):
-        os.makedirs("plots")
-    plt.savefig(os.path.join('plots', name + '.png'), dpi=150, bbox_inches='tight')
-    plt.savefig(os.path.join('plots', name + '.pdf'), dpi=150, bbox_inches='tight')
-    plt.tight_layout()
+
+    def __init__(self, lines, blit=True):
+        """
+        Parameters
+        ----------
+        lines : list of matplotlib.lines.Line2D
+            as returned by plot_lines or plot_scatter
+        blit : bool, optional
+
+        Raises
+        ------
+        ValueError
+            if the lines are the stand-ins of series drawn as a collection or density map
+        """
+        if any(getattr(line, 'pubplots_stand_in', False) for line in lines):
+            raise ValueError('The lines stand in for series drawn as a collection or density '
+                             'map and can not be updated, plot without collection=True and with '
+                             'fewer points than density_above')
+        self.lines = lines
+        self.figure = lines[0].figure
+        self.blit = blit and self.figure.canvas.supports_blit
+        self.axes = []
+        for line in lines:
+            if line.axes not in self.axes:
+                self.axes.append(line.axes)
+            line.set_animated(self.blit)
+        self._backgrounds = None
+
+    def _outside_view(self):
+        """True if the data of an autoscaled axes is no longer inside its view limits"""
+        for line in self.lines:
+            ax = line.axes
+            x = np.asarray(line.get_xdata(), dtype=float)
+            y = np.asarray(line.get_ydata(), dtype=float)
+            if x.size == 0:
+                continue
+            xlim = sorted(ax.get_xlim())
+            ylim = sorted(ax.get_ylim())
+            if ax.get_autoscalex_on() and (np.nanmin(x) < xlim[0] or np.nanmax(x) > xlim[1]):
+                return True
+            if ax.get_autoscaley_on() and (np.nanmin(y) < ylim[0] or np.nanmax(y) > ylim[1]):
+                return True
+        return False
+
+    def update(self, yset):
+        """Set the line data to yset and redraw
+
+        Parameters
+        ----------
+        yset : list
+            list of data like [[x1array, y1array], [x2array, y2array].....] in the same order
+            as the lines
+        """
+        for line, data in zip(self.lines, yset):
+            line.set_data(data[0], data[1])
+        canvas = self.figure.canvas
+        rescale = self._outside_view()
+        if rescale:
+            for ax in self.axes:
+                ax.relim()
+                ax.autoscale_view()
+        if not self.blit:
+            canvas.draw_idle()
+            return
+        if rescale or self._backgrounds is None:
+            # full redraw without the animated lines, then save the clean background
+            canvas.draw()
+            self._backgrounds = [canvas.copy_from_bbox(ax.bbox) for ax in self.axes]
+        for background in self._backgrounds:
+            canvas.restore_region(background)
+        for line in self.lines:
+            line.axes.draw_artist(line)
+        for ax in self.axes:
+            canvas.blit(ax.bbox)
+        canvas.flush_events()
+
+    def stop(self):
+        """Stop blitting, the lines are drawn normally again and included in saved files"""
+        for line in self.lines:
+            line.set_animated(False)
+        self.blit = False
+        self._backgrounds = None
+        self.figure.canvas.draw_idle()
+
 
 def label_line(ax, x, y, label_text, color,
                at_x=0,
@@ -816,23 +1647,8 @@ def label_line(ax, x, y, label_text, color,
     offset : tuple, optional
         (x,y) offset from intial selected position
     """
-    sat_x = at_x
-    # Check for log scales
-    if ax.get_xscale() == 'log':
-        sx = np.log10(x)    # screen space
-        sat_x = np.log10(at_x)
-    else:
-        sx = x
-    if ax.get_yscale() == 'log':
-        sy = np.log10(y)
-    else:
-        sy = y
-    # place labels using numpy interpolation
-    rotation = 0
-    if rotation_on is True:
-        dx = (sat_x+(ax.get_xlim()[1]-ax.get_xlim()[0])/20.0)/(ax.get_xlim()[1]-ax.get_xlim()[0])
-        dy = np.interp(sat_x+dx, sx, sy)-np.interp(sat_x, sx, sy)
-        rotation = 2*np.rad2deg(math.atan2(dy, dx))
-    pos = [at_x+offset[0], np.interp(at_x, x, y)+offset[1]]
-    ax.text(pos[0], pos[1], label_text, size=fontsize, rotation=rotation, color=color,
-             ha="center", va="center", bbox=dict(ec='1', fc='1'), **kwargs)
+    positions, rotations = label_positions(ax, [[x, y]], [at_x], offsets=[offset],
+                                           rotation_on=rotation_on)
+    return ax.text(positions[0][0], positions[0][1], label_text, size=fontsize,
+                   rotation=rotations[0], color=color,
+                   ha="center", va="center", bbox=dict(ec='1', fc='1'), **kwargs)
@@ -1,9 +1,18 @@
 """Contains the PlotData class for preparing plot data from pandas dataframes and csv files
 """
 import numpy as np
-import pandas as pd
+import collections
+import hashlib
+import io
 import math
 import os
+import tempfile
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+from pubplots.cache import FrameCache
+from pubplots.discover import find_files
+from pubplots.readers import read_table
+from pubplots.series import SeriesBlock
 
 
 # This function is needed as the default function for a method in Data()
@@ -29,9 +38,30 @@ class PlotData(object):
     yr2set : list of data to be plotted to right hand axes [[x array,y array], [x2 array, y2 array].....]
     yr2axislabel : second right hand axes label
     yr2labels : second right hand line labels
+    cache : None or FrameCache
+        on-disk cache of parsed files, see pubplots.cache
+    memmap : None or str
+        directory used for memory-mapped columns, None keeps the DataFrames in memory
     """
 
-    def __init__(self):
+    def __init__(self, cache=None, memmap=None):
+        """
+        Parameters
+        ----------
+        cache : None, str or FrameCache, optional
+            cache parsed files on disk so unchanged files are not parsed again. A string is
+            used as the cache directory of a new FrameCache
+        memmap : None, True or str, optional
+            directory to back the plotted columns with memory-mapped .npy files, True uses the
+            system temporary directory. The DataFrames are then not kept in self.frames and
+            yset etc. hold read-only numpy arrays instead of pandas Series
+        """
+        if isinstance(cache, str):
+            cache = FrameCache(cache)
+        if memmap is True:
+            memmap = tempfile.gettempdir()
+        self.cache = cache
+        self.memmap = memmap
         self.files = []
         self.frames = []
         self.yset = []
@@ -47,6 +77,11 @@ class PlotData(object):
         self.yaxislabel = None
         self.yraxislabel = None
         self.yr2axislabel = None
+        self._followed = []
+        # one segment per prepare_frame call, in order, recording how many entries it added
+        # to each of the _SEGMENT_LISTS and the file it came from. See PlotData.refresh
+        self._segments = []
+        self._loads = []
 
     def prepare_frame(self, dataframe, sort=True, xcol=0,
             ycols=[1], labels=[],
@@ -85,57 +120,139 @@ class PlotData(object):
         yr2axislabel : str, optional
             Description
         """
+        self._check_expanded()
+        before = self._lengths()
         if sort:
             try:
                 dataframe.sort_values(by=dataframe.iloc[:,xcol].name, inplace=True)
             except AttributeError:
                 #older version of pandas
                 dataframe.sort(dataframe.iloc[:,xcol].name, inplace=True)
-        self.frames.append(dataframe)
+        if self.memmap is None:
+            self.frames.append(dataframe)
+            column = lambda col: dataframe.iloc[:, col]
+        else:
+            column = self._memmap_columns(dataframe)
+        names = dataframe.columns
+        x = column(xcol)
         # make pointers to the data in the yset, yrset lists
         for ycol in ycols:
-            self.yset.append([self.frames[-1].iloc[:, xcol], self.frames[-1].iloc[:, ycol]])
+            self.yset.append([x, column(ycol)])
         for ycol in yrcols:
-            self.yrset.append([self.frames[-1].iloc[:, xcol], self.frames[-1].iloc[:, ycol]])
+            self.yrset.append([x, column(ycol)])
         for ycol in yr2cols:
-            self.yr2set.append([self.frames[-1].iloc[:, xcol], self.frames[-1].iloc[:, ycol]])
+            self.yr2set.append([x, column(ycol)])
         for ercol in yerrors:
-            self.yerrors.append([self.frames[-1].iloc[:, xcol], self.frames[-1].iloc[:, ercol]])
+            self.yerrors.append([x, column(ercol)])
         for ercol in xerrors:
-            self.xrerrors.append([self.frames[-1].iloc[:, xcol], self.frames[-1].iloc[:, ercol]])
+            self.xerrors.append([x, column(ercol)])
         # Set axis labels
         if xaxislabel:
             self.xaxislabel = xaxislabel
         elif self.xaxislabel is None and self.yset!=[]:
-            self.xaxislabel = self.yset[0][0].name
+            self.xaxislabel = names[xcol]
         if yaxislabel:
             self.yaxislabel = yaxislabel
-        elif self.yaxislabel is None and self.yset!=[]:
-            self.yaxislabel = self.yset[0][1].name
+        elif self.yaxislabel is None and ycols!=[]:
+            self.yaxislabel = names[ycols[0]]
         if yraxislabel:
             self.yraxislabel = yraxislabel
-        elif self.yraxislabel is None and self.yrset!=[]:
-            self.yraxislabel = self.yrset[0][1].name
+        elif self.yraxislabel is None and yrcols!=[]:
+            self.yraxislabel = names[yrcols[0]]
         if yr2axislabel:
             self.yr2axislabel = yr2axislabel
-        elif self.yr2axislabel is None and self.yr2set!=[]:
-            self.yr2axislabel = self.yr2set[0][1].name
+        elif self.yr2axislabel is None and yr2cols!=[]:
+            self.yr2axislabel = names[yr2cols[0]]
         # If no labels are given, take them from the pandas DataFrame labels
         if labels != []:
             self.labels+=labels
         else:
             for ycol in ycols:
-                self.labels.append(self.frames[-1].iloc[:, ycol].name)
+                self.labels.append(names[ycol])
         if yrlabels != []:
             self.yrlabels+=yrlabels
         else:
             for ycol in yrcols:
-                self.yrlabels.append(self.frames[-1].iloc[:, ycol].name)
+                self.yrlabels.append(names[ycol])
         if yr2labels != []:
             self.yr2labels+=yr2labels
         else:
             for ycol in yr2cols:
-                self.yr2labels.append(self.frames[-1].iloc[:, ycol].name)
+                self.yr2labels.append(names[ycol])
+        self._segments.append({'source': None, 'counts': dict(
+            (attr, length-before[attr]) for attr, length in self._lengths().items())})
+
+    def _check_expanded(self):
+        """Raise a ValueError if the sets have been compacted"""
+        if isinstance(self.yset, SeriesBlock):
+            raise ValueError('The data of a compacted PlotData can not be changed, load it '
+                             'before calling PlotData.compact')
+
+    def _lengths(self):
+        """Current length of each of the _SEGMENT_LISTS"""
+        return dict((attr, len(getattr(self, attr))) for attr in _SEGMENT_LISTS)
+
+    def _add_file(self, filename, source=None):
+        """Record filename in self.files as the file of the last prepared frame"""
+        self.files.append(filename)
+        segment = self._segments[-1]
+        segment['counts']['files'] += 1
+        segment['source'] = source
+        return segment
+
+    def _segment_slices(self):
+        """Generate each segment with the slices of the _SEGMENT_LISTS holding its entries
+
+        Yields
+        ------
+        segment, dict
+            the segment and a dict of attribute name to slice
+        """
+        start = dict((attr, 0) for attr in _SEGMENT_LISTS)
+        for segment in self._segments:
+            slices = {}
+            for attr in _SEGMENT_LISTS:
+                stop = start[attr]+segment['counts'][attr]
+                slices[attr] = slice(start[attr], stop)
+                start[attr] = stop
+            yield segment, slices
+
+    def _memmap_columns(self, dataframe):
+        """Make a function that copies columns of the dataframe to memory-mapped .npy files in
+        self.memmap and returns the read-only mapped arrays. Each column is only written once.
+        The files are unlinked as soon as they are mapped, so they are cleaned up when the
+        arrays are released.
+
+        Parameters
+        ----------
+        dataframe : pandas.DataFrame
+
+        Returns
+        -------
+        function
+            column(col) returning the np.memmap of column position col
+        """
+        mapped = {}
+
+        def column(col):
+            if col not in mapped:
+                values = np.ascontiguousarray(dataframe.iloc[:, col].to_numpy())
+                if values.dtype.hasobject:
+                    raise ValueError('Only numeric columns can be memory-mapped, column %s '
+                                     'is %s' % (dataframe.columns[col], values.dtype))
+                fd, path = tempfile.mkstemp(suffix='.npy', prefix='pubplots-', dir=self.memmap)
+                try:
+                    with os.fdopen(fd, 'wb') as npy:
+                        np.save(npy, values)
+                    mapped[col] = np.load(path, mmap_mode='r')
+                finally:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        # can't unlink a mapped file on windows, it is left in the directory
+                        pass
+            return mapped[col]
+        return column
 
     def onefile(self, filename, header=0, xcol=0,
             ycols=[1], labels=[],
@@ -145,7 +262,8 @@ class PlotData(object):
             xaxislabel=None, yaxislabel=None, yraxislabel=None, yr2axislabel=None,
             **kwargs):
         """Add data from a single file to our data set, pass **kwargs to pandas.read_csv and then
-        uses prepare frame
+        uses prepare frame. Parquet, Feather, HDF5 and .npz/.npy files are recognised by their
+        extension and read without parsing, see pubplots.readers
 
         Parameters
         ----------
@@ -155,15 +273,113 @@ class PlotData(object):
             Which row to use as a header, default is header=0 which takes the first row
         other paramaters:
             see PlotData.prepare_frame method
+        **kwargs : TYPE
+            aditional arguements passed to pandas.read_csv method, or the reader of a binary
+            format. format='parquet' etc. overrides the extension
+        """
+        self._load_files([filename], header=header, read_kwargs=kwargs, xcol=xcol,
+                         ycols=ycols, labels=labels, yrcols=yrcols, yrlabels=yrlabels,
+                         yr2cols=yr2cols, yr2labels=yr2labels, xerrors=xerrors, yerrors=yerrors,
+                         xaxislabel=xaxislabel, yaxislabel=yaxislabel,
+                         yraxislabel=yraxislabel, yr2axislabel=yr2axislabel)
+
+    def onefile_chunked(self, filename, header=0, xcol=0,
+            ycols=[1], labels=[],
+            yrcols=[], yrlabels=[],
+            yr2cols=[], yr2labels=[],
+            xerrors=[], yerrors=[],
+            xaxislabel=None, yaxislabel=None, yraxislabel=None, yr2axislabel=None,
+            chunksize=1000000, points=5000, reduce='mean', window_len=None,
+            window='blackman', **kwargs):
+        """Load a csv file too large for memory. The file is read in chunks of rows and reduced
+        to between points and 2*points bins as it streams past, so memory use is bounded by the
+        chunksize and points whatever the size of the file. The rows have to be in ascending
+        order of the xcol, as they can't be sorted, and the plotted columns numeric. The reduced
+        data is passed to prepare_frame as usual. The file is not reloaded by PlotData.refresh
+
+        Parameters
+        ----------
+        filename : str
+            The file to be processed
+        header : int, optional
+            Which row to use as a header, default is header=0 which takes the first row
+        chunksize : int, optional
+            number of rows read at a time
+        points : int, optional
+            least number of bins to reduce the rows to
+        reduce : str, optional
+            'mean' averages each bin, 'minmax' keeps the extremes of each bin as two points so
+            peaks are not lost and 'decimate' keeps the first row of each bin. See
+            pubplots.stream.StreamBinner
+        window_len : None or int, optional
+            smooth the ycols with this window before reducing them, which gives the same result
+            as PlotData.smooth on the full data
+        window : str, optional
+            the type of smoothing window, see PlotData.smooth
+        other paramaters:
+            see PlotData.prepare_frame method
         **kwargs : TYPE
             aditional arguements passed to pandas.read_csv method
+
+        Raises
+        ------
+        ValueError
+            if the rows are not sorted by the xcol
         """
-        self.files.append(filename)
-        self.prepare_frame(pd.read_csv(filename, header=header, **kwargs), xcol=xcol,
-                           ycols=ycols, labels=labels, yrcols=yrcols, yrlabels=yrlabels,
-                           yr2cols=yr2cols, yr2labels=yr2labels, xerrors=xerrors, yerrors=yerrors,
-                           xaxislabel=xaxislabel, yaxislabel=yaxislabel,
-                           yraxislabel=yraxislabel, yr2axislabel=yr2axislabel)
+        import pandas as pd
+        from pubplots.stream import StreamSmoother, StreamBinner
+        self._check_expanded()
+        frame_kwargs = {'xcol': xcol, 'ycols': ycols, 'yrcols': yrcols, 'yr2cols': yr2cols,
+                        'xerrors': xerrors, 'yerrors': yerrors}
+        read_kwargs, fallback, frame_kwargs = _project_columns(kwargs, frame_kwargs)
+        xcol = frame_kwargs['xcol']
+        cols = []
+        for key in ('ycols', 'yrcols', 'yr2cols', 'xerrors', 'yerrors'):
+            cols += [col for col in frame_kwargs[key] if col not in cols]
+        smoothed = [i for i, col in enumerate(cols) if col in frame_kwargs['ycols']]
+        passed = [i for i in range(len(cols)) if i not in smoothed]
+        smoother = StreamSmoother(window_len or 0, window)
+        binner = StreamBinner(points=points, reduce=reduce)
+        names = None
+        last = -np.inf
+        row = 0
+        for chunk in pd.read_csv(filename, header=header, chunksize=chunksize, **read_kwargs):
+            if names is None:
+                names = chunk.columns
+            x = chunk.iloc[:, xcol].to_numpy(dtype=float)
+            values = chunk.iloc[:, cols].to_numpy(dtype=float)
+            unsorted = np.flatnonzero(np.diff(np.r_[last, x]) < 0)
+            if unsorted.size:
+                raise ValueError('%s is not sorted by column %s at row %d, chunked loading '
+                                 'needs the rows in ascending order'
+                                 % (filename, names[xcol], row+unsorted[0]))
+            if len(x):
+                last = x[-1]
+            row += len(x)
+            # the columns that aren't smoothed pass through with x so they stay in step
+            through, ys = smoother.feed(np.column_stack([x, values[:, passed]]),
+                                        values[:, smoothed])
+            _bin_rows(binner, through, ys, smoothed, passed)
+        if names is None:
+            raise ValueError('%s has no rows' % filename)
+        if window_len:
+            through, ys = smoother.finish()
+            _bin_rows(binner, through, ys, smoothed, passed)
+        x, values = binner.result()
+        data = {names[xcol]: x}
+        for i, col in enumerate(cols):
+            data[names[col]] = values[:, i] if len(values) else np.zeros(0)
+        # the reduced frame holds only the used columns, in the positions of the read frame
+        used = sorted(set([xcol]+cols))
+        frame = pd.DataFrame(dict((names[col], data[names[col]]) for col in used))
+        position = dict((col, i) for i, col in enumerate(used))
+        for key in ('ycols', 'yrcols', 'yr2cols', 'xerrors', 'yerrors'):
+            frame_kwargs[key] = [position[col] for col in frame_kwargs[key]]
+        frame_kwargs['xcol'] = position[xcol]
+        self.prepare_frame(frame, sort=False, labels=labels, yrlabels=yrlabels,
+                           yr2labels=yr2labels, xaxislabel=xaxislabel, yaxislabel=yaxislabel,
+                           yraxislabel=yraxislabel, yr2axislabel=yr2axislabel, **frame_kwargs)
+        self._add_file(filename)
 
     def filelist(self, files=[], header=0, xcol=0,
             ycols=[1], labels=[],
@@ -171,8 +387,9 @@ class PlotData(object):
             yr2cols=[], yr2labels=[],
             xerrors=[], yerrors=[], yrerrors=[], yr2errors=[],
             xaxislabel=None, yaxislabel=None, yraxislabel=None, yr2axislabel=None,
-            **kwargs):
-        """Load a list of files, pass **kwargs to pandas.read_csv
+            workers=None, pool='thread', **kwargs):
+        """Load a list of files, pass **kwargs to pandas.read_csv. Binary formats are read by
+        extension as in PlotData.onefile
 
         Parameters
         ----------
@@ -180,19 +397,22 @@ class PlotData(object):
             list of files to be loaded
         header : int, optional
             Which row to use as a header, default is header=0 which takes the first row
+        workers : None or int, optional
+            number of files to parse concurrently. None or 1 loads the files one at a time
+        pool : str, optional
+            'thread' or 'process', the kind of worker pool used when workers > 1
         other paramaters:
             see PlotData.prepare_frame method
         **kwargs : TYPE
-            aditional arguements passed to pandas.read_csv method
+            aditional arguements passed to pandas.read_csv method, or the reader of a binary
+            format. format='parquet' etc. overrides the extension
         """
-        for filename in files:
-            self.files.append(filename)
-            self.prepare_frame(pd.read_csv(filename, header=header, **kwargs), xcol=xcol,
-                               ycols=ycols, labels=labels, yrcols=yrcols, yrlabels=yrlabels,
-                               yr2cols=yr2cols, yr2labels=yr2labels, xerrors=xerrors,
-                               yerrors=yerrors,
-                               xaxislabel=xaxislabel, yaxislabel=yaxislabel,
-                               yraxislabel=yraxislabel, yr2axislabel=yr2axislabel)
+        self._load_files(files, header=header, workers=workers, pool=pool, read_kwargs=kwargs,
+                         xcol=xcol, ycols=ycols, labels=labels, yrcols=yrcols, yrlabels=yrlabels,
+                         yr2cols=yr2cols, yr2labels=yr2labels, xerrors=xerrors,
+                         yerrors=yerrors,
+                         xaxislabel=xaxislabel, yaxislabel=yaxislabel,
+                         yraxislabel=yraxislabel, yr2axislabel=yr2axislabel)
 
     def walkandfind(self, startpath='data', search=None, header=0, xcol=0,
             ycols=[1], labels=[],
@@ -200,9 +420,12 @@ class PlotData(object):
             yr2cols=[], yr2labels=[],
             xerrors=[], yerrors=[],
             xaxislabel=None, yaxislabel=None, yraxislabel=None, yr2axislabel=None,
-            **kwargs):
+            workers=None, pool='thread', pattern=None, regex=None, recursive=True,
+            manifest=None, verbose=False, **kwargs):
         """Search in a specified path for files containing a certain string and then load them
-        up as data.The path can be relative or an absolute path.
+        up as data.The path can be relative or an absolute path. Subdirectories are searched
+        too, the files in each directory are loaded in sorted order. With workers the files are
+        parsed while the search carries on.
 
         Parameters
         ----------
@@ -212,32 +435,385 @@ class PlotData(object):
             load file names containing this string, default is '.csv'.
         header : int, optional
             Which row to use as a header, default is header=0 which takes the first row
+        workers : None or int, optional
+            number of files to parse concurrently. None or 1 loads the files one at a time
+        pool : str, optional
+            'thread' or 'process', the kind of worker pool used when workers > 1
+        pattern : None or str, optional
+            load file names matching this glob pattern, like '*.csv'
+        regex : None or str, optional
+            load file names matching this regular expression
+        recursive : bool, optional
+            search subdirectories
+        manifest : None or str, optional
+            JSON file recording the directory listings, unchanged directories are not listed
+            again. See pubplots.discover.Manifest
+        verbose : bool, optional
+            print the names of the loaded files
+        other paramaters:
+            see PlotData.prepare_frame method
+        **kwargs : TYPE
+            aditional arguements passed to pandas.read_csv method, or the reader of a binary
+            format. format='parquet' etc. overrides the extension
+        """
+        find = {'startpath': startpath, 'search': search, 'pattern': pattern, 'regex': regex,
+                'recursive': recursive, 'manifest': manifest}
+        self._load_files(find_files(**find), header=header, workers=workers, pool=pool,
+                         read_kwargs=kwargs, verbose=verbose, find=find,
+                         xcol=xcol, ycols=ycols, labels=labels, yrcols=yrcols, yrlabels=yrlabels,
+                         yr2cols=yr2cols, yr2labels=yr2labels, xerrors=xerrors,
+                         yerrors=yerrors,
+                         xaxislabel=xaxislabel, yaxislabel=yaxislabel,
+                         yraxislabel=yraxislabel, yr2axislabel=yr2axislabel)
+
+    def _load_files(self, paths, header=0, workers=None, pool='thread', read_kwargs={},
+                    verbose=False, find=None, **frame_kwargs):
+        """Parse files, optionally in a pool of workers, and pass the frames to prepare_frame in
+        the order the files were given. paths can be a generator, with a pool it is consumed
+        while earlier files are being parsed.
+
+        Parameters
+        ----------
+        paths : iterable of str
+            the files, recorded in self.files
+        header : int, optional
+        workers : None or int, optional
+            number of files to parse concurrently. None or 1 loads the files one at a time
+        pool : str, optional
+            'thread' or 'process'
+        read_kwargs : dict, optional
+            passed to pandas.read_csv
+        verbose : bool, optional
+            print the names of the loaded files
+        find : None or dict, optional
+            the pubplots.discover.find_files arguments that generate paths, PlotData.refresh
+            searches again with them for new files
+        **frame_kwargs :
+            passed to PlotData.prepare_frame
+        """
+        self._check_expanded()
+        # remembered so PlotData.refresh can load the files again the same way
+        load = {'header': header, 'read_kwargs': read_kwargs, 'frame_kwargs': frame_kwargs,
+                'find': find, 'paths': None}
+        if find is None:
+            paths = load['paths'] = list(paths)
+        self._loads.append(load)
+        read_kwargs, fallback, frame_kwargs = _project_columns(read_kwargs, frame_kwargs)
+        submitted = collections.deque()
+
+        def jobs():
+            for path in paths:
+                submitted.append(path)
+                yield (path, header, read_kwargs, self.cache, fallback)
+        jobs = jobs()
+        if workers is None or workers <= 1:
+            frames = map(_read_job, jobs)
+            workpool = None
+        elif pool == 'thread':
+            workpool = ThreadPool(workers)
+            frames = workpool.imap(_read_job, jobs)
+        elif pool == 'process':
+            workpool = Pool(workers)
+            frames = workpool.imap(_read_job, jobs)
+        else:
+            raise ValueError("pool must be one of 'thread' or 'process'")
+        try:
+            # imap hands back the frames in submission order, so the series
+            # and labels line up exactly as they do for a serial load
+            for signature, frame in frames:
+                # a job is always submitted before its frame comes back
+                filename = submitted.popleft()
+                if verbose:
+                    print(filename)
+                self.prepare_frame(frame, **frame_kwargs)
+                self._add_file(filename, {'load': load, 'path': filename,
+                                          'signature': signature})
+        finally:
+            if workpool is not None:
+                workpool.terminate()
+
+    def follow(self, filename, header=0, xcol=0,
+            ycols=[1], labels=[],
+            yrcols=[], yrlabels=[],
+            yr2cols=[], yr2labels=[],
+            xerrors=[], yerrors=[],
+            xaxislabel=None, yaxislabel=None, yraxislabel=None, yr2axislabel=None,
+            **kwargs):
+        """Load a file that is still being written to, like a furnace log, and keep track of how
+        much of it has been read. PlotData.update then parses only the rows appended since. The
+        rows are not sorted, they are expected to arrive in order of the xcol.
+
+        Parameters
+        ----------
+        filename : str
+            The file to be processed
+        header : int, optional
+            Which row to use as a header, default is header=0 which takes the first row
         other paramaters:
             see PlotData.prepare_frame method
         **kwargs : TYPE
             aditional arguements passed to pandas.read_csv method
+
+        A file with no complete line yet is followed with no rows. Its columns are named by
+        their position, or by names= when given, until update reads the header.
         """
-        for root, dirs, files in os.walk(startpath):
-            load = []
-            # make list of files matching the search
-            for filename in files:
-                if search is None:
-                    load.append(filename)
-                elif filename.find(search) != -1:
-                    load.append(filename)
-            load.sort()
-            self.files+=load
-            print('Files Loaded:')
-            for filename in load:
-                print(filename)
-                self.prepare_frame(pd.read_csv(os.path.join(startpath,filename), header=header, **kwargs),
-                               xcol=xcol, ycols=ycols, labels=labels, yrcols=yrcols, yrlabels=yrlabels,
-                               yr2cols=yr2cols, yr2labels=yr2labels, xerrors=xerrors,
-                               yerrors=yerrors,
-                               xaxislabel=xaxislabel, yaxislabel=yaxislabel,
-                               yraxislabel=yraxislabel, yr2axislabel=yr2axislabel)
-
-    def fit(self, deg=1):
+        import pandas as pd
+        self._check_expanded()
+        if self.memmap is not None:
+            raise ValueError('Followed files can not be memory-mapped')
+        with open(filename, 'rb') as f:
+            text = f.read()
+        # only parse complete lines, a partly written row is picked up by the next update
+        offset = text.rfind(b'\n')+1
+        header_pending = False
+        try:
+            frame = pd.read_csv(io.BytesIO(text[:offset]), header=header, **kwargs)
+        except pd.errors.EmptyDataError:
+            columns = kwargs.get('names')
+            if columns is None:
+                columns = range(max([xcol]+ycols+yrcols+yr2cols+xerrors+yerrors)+1)
+            frame = pd.DataFrame(columns=list(columns), dtype=float)
+            header_pending = header is not None and kwargs.get('names') is None
+            offset = 0
+        self.prepare_frame(frame, sort=False, xcol=xcol,
+                           ycols=ycols, labels=labels, yrcols=yrcols, yrlabels=yrlabels,
+                           yr2cols=yr2cols, yr2labels=yr2labels, xerrors=xerrors, yerrors=yerrors,
+                           xaxislabel=xaxislabel, yaxislabel=yaxislabel,
+                           yraxislabel=yraxislabel, yr2axislabel=yr2axislabel)
+        # the segment locates the series, they move if PlotData.refresh splices in files
+        segment = self._add_file(filename)
+        self._followed.append({'filename': filename, 'offset': offset, 'segment': segment,
+                               'xcol': xcol, 'kwargs': kwargs, 'names': list(frame.columns),
+                               'sets': [('yset', ycols), ('yrset', yrcols), ('yr2set', yr2cols),
+                                        ('yerrors', yerrors), ('xerrors', xerrors)],
+                               'header': header if header_pending else None,
+                               'named': [('labels', ycols, labels), ('yrlabels', yrcols, yrlabels),
+                                         ('yr2labels', yr2cols, yr2labels)],
+                               'axes': [('xaxislabel', xcol, xaxislabel),
+                                        ('yaxislabel', (ycols or [None])[0], yaxislabel),
+                                        ('yraxislabel', (yrcols or [None])[0], yraxislabel),
+                                        ('yr2axislabel', (yr2cols or [None])[0], yr2axislabel)],
+                               'columns': None, 'rows': len(frame)})
+
+    def update(self):
+        """Read the rows appended to the followed files since the last read and extend the
+        series in yset, yrset etc. with them. The rows are appended to column buffers that
+        double in size when they fill up, so a long running follow doesn't copy all of its
+        rows on every update
+
+        Returns
+        -------
+        int
+            number of new rows
+        """
+        import pandas as pd
+        self._check_expanded()
+        added = 0
+        slices = dict((id(segment), segment_slices)
+                      for segment, segment_slices in self._segment_slices())
+        for followed in self._followed:
+            with open(followed['filename'], 'rb') as f:
+                f.seek(followed['offset'])
+                text = f.read()
+            end = text.rfind(b'\n')+1
+            if end == 0:
+                continue
+            followed['offset'] += end
+            # the names of the columns are those read by follow
+            kwargs = dict((key, value) for key, value in followed['kwargs'].items()
+                          if key not in ('skiprows', 'nrows', 'skipfooter', 'names'))
+            segment = slices[id(followed['segment'])]
+            try:
+                if followed['header'] is not None:
+                    # the header of a file that was empty when it was followed
+                    rows = pd.read_csv(io.BytesIO(text[:end]), header=followed['header'],
+                                       **kwargs)
+                    self._name_followed(followed, segment, list(rows.columns))
+                    followed['header'] = None
+                else:
+                    rows = pd.read_csv(io.BytesIO(text[:end]), header=None,
+                                       names=followed['names'], **kwargs)
+            except pd.errors.EmptyDataError:
+                continue
+            if len(rows) == 0:
+                continue
+            added += len(rows)
+            position = segment['frames'].start
+            if followed['columns'] is None:
+                frame = self.frames[position]
+                followed['columns'] = [frame.iloc[:, i].to_numpy()
+                                       for i in range(frame.shape[1])]
+            followed['columns'] = _append_rows(followed['columns'], followed['rows'], rows)
+            followed['rows'] += len(rows)
+            frame = pd.DataFrame(dict((i, column[:followed['rows']]) for i, column
+                                      in enumerate(followed['columns'])), copy=False)
+            frame.columns = followed['names']
+            self.frames[position] = frame
+            # point the series at the extended frame
+            x = frame.iloc[:, followed['xcol']]
+            for attr, cols in followed['sets']:
+                series = getattr(self, attr)
+                for i, col in enumerate(cols):
+                    series[segment[attr].start+i] = [x, frame.iloc[:, col]]
+        return added
+
+    def _name_followed(self, followed, segment, names):
+        """Give the columns of a followed file that was empty the names from its header, with
+        the labels that were taken from the column names"""
+        followed['names'] = names
+        position = segment['frames'].start
+        self.frames[position].columns = names
+        for attr, cols, given in followed['named']:
+            if given == []:
+                labels = getattr(self, attr)
+                for i, col in enumerate(cols):
+                    labels[segment[attr].start+i] = names[col]
+        for attr, col, given in followed['axes']:
+            # only the axis labels set to a column position by this file
+            if not given and col is not None and getattr(self, attr) == col:
+                setattr(self, attr, names[col])
+
+    def compact(self):
+        """Store each of yset, yrset, yr2set, yerrors and xerrors in a SeriesBlock, one float64
+        buffer holding all of its series with an x array shared by the series that have the
+        same x data, and drop the DataFrames. This takes far less memory than the lists of pandas
+        Series for thousands of series. The sets still index like lists of [x, y] pairs so the
+        plot functions work as before, but no more data can be loaded, followed or refreshed.
+        The fits are left as they are.
+
+        Returns
+        -------
+        int
+            bytes used by the blocks
+        """
+        nbytes = 0
+        for attr in _COMPACT_SETS:
+            block = getattr(self, attr)
+            if not isinstance(block, SeriesBlock):
+                block = SeriesBlock(block)
+                setattr(self, attr, block)
+            nbytes += block.nbytes()
+        del self.frames[:]
+        return nbytes
+
+    def refresh(self, workers=None, pool='thread'):
+        """Bring the data up to date with the files it was loaded from, without loading
+        everything again. Files whose size or modification time changed are hashed and parsed
+        again if their contents differ, deleted files are dropped and new files matching a
+        PlotData.walkandfind search, or reappearing in a file list, are loaded. Their series and
+        labels are spliced into yset, labels etc. at the positions a fresh load would put them,
+        the lists themselves are updated in place. Frames added with prepare_frame or follow
+        are left as they are. The reloaded series are not smoothed.
+
+        If the fits were made by a single call of PlotData.fit, one per series of yset, the
+        fits of the kept series are kept and the new and changed series are fitted with the
+        same degree. Otherwise the fits no longer line up with yset and are cleared when
+        anything changed.
+
+        Parameters
+        ----------
+        workers : None or int, optional
+            number of files to parse concurrently. None or 1 loads the files one at a time
+        pool : str, optional
+            'thread' or 'process', the kind of worker pool used when workers > 1
+
+        Returns
+        -------
+        dict
+            lists of the 'added', 'changed' and 'removed' files
+        """
+        self._check_expanded()
+        changes = {'added': [], 'changed': [], 'removed': []}
+        # files to insert, keyed by the segment they go after, or before for the first files
+        # of a load. None collects those of loads that have no files left
+        after = {}
+        before = {}
+        for load in self._loads:
+            if load['find'] is not None:
+                current = list(find_files(**load['find']))
+            else:
+                current = [path for path in load['paths'] if os.path.isfile(path)]
+            tracked = dict((segment['source']['path'], segment) for segment in self._segments
+                           if segment['source'] is not None and segment['source']['load'] is load)
+            anchor = None
+            first = []
+            for path in current:
+                if path in tracked:
+                    anchor = tracked[path]
+                elif anchor is None:
+                    first.append(path)
+                else:
+                    after.setdefault(id(anchor), []).append((load, path))
+            if first:
+                following = [tracked[path] for path in current if path in tracked]
+                key = id(following[0]) if following else None
+                before.setdefault(key, []).extend((load, path) for path in first)
+        # work out the new order of the segments, None marks a file still to be parsed
+        plan = []
+        for segment in self._segments:
+            plan += [(None, load, path) for load, path in before.get(id(segment), [])]
+            source = segment['source']
+            if source is None:
+                plan.append((segment, None, None))
+            else:
+                try:
+                    signature = _file_signature(source['path'], source['signature'])
+                except OSError:
+                    signature = None
+                if signature is None:
+                    changes['removed'].append(source['path'])
+                elif _file_changed(source['signature'], signature):
+                    changes['changed'].append(source['path'])
+                    plan.append((None, source['load'], source['path']))
+                else:
+                    source['signature'] = signature
+                    plan.append((segment, None, None))
+            plan += [(None, load, path) for load, path in after.get(id(segment), [])]
+        plan += [(None, load, path) for load, path in before.get(None, [])]
+        changes['added'] = [path for segment, load, path in plan
+                            if segment is None and path not in changes['changed']]
+        if not changes['added'] and not changes['changed'] and not changes['removed']:
+            return changes
+        # parse the changed and new files, the files of each load together
+        loaded = {}
+        for load in self._loads:
+            paths = [path for segment, plan_load, path in plan if plan_load is load]
+            if not paths:
+                continue
+            scratch = PlotData(cache=self.cache, memmap=self.memmap)
+            scratch._load_files(paths, header=load['header'], workers=workers, pool=pool,
+                                read_kwargs=load['read_kwargs'], **load['frame_kwargs'])
+            for segment, slices in scratch._segment_slices():
+                segment['source']['load'] = load
+                loaded[(id(load), segment['source']['path'])] = (scratch, segment, slices)
+        # splice the kept and loaded segments together
+        current = dict((id(segment), slices) for segment, slices in self._segment_slices())
+        lists = dict((attr, []) for attr in _SEGMENT_LISTS)
+        # fits made by one call of fit line up with yset, those of the kept series are kept
+        degs = set(len(fit[2])-1 for fit in self.fits)
+        refit = len(self.fits) == len(self.yset) and len(degs) == 1
+        fits = []
+        segments = []
+        for segment, load, path in plan:
+            if segment is None:
+                plotdata, segment, slices = loaded[(id(load), path)]
+                if refit:
+                    fits += [_fit_line(data, *np.polyfit(data[0], data[1], cov=True,
+                                                         deg=min(degs)))
+                             for data in plotdata.yset[slices['yset']]]
+            else:
+                plotdata, slices = self, current[id(segment)]
+                fits += self.fits[slices['yset']]
+            segments.append(segment)
+            for attr in _SEGMENT_LISTS:
+                lists[attr] += getattr(plotdata, attr)[slices[attr]]
+        for attr in _SEGMENT_LISTS:
+            getattr(self, attr)[:] = lists[attr]
+        self._segments = segments
+        self.fits[:] = fits if refit else []
+        return changes
+
+    def fit(self, deg=1, batch=False, verbose=True):
         """fit the data usying a polynomial, store a fit of the data and the errors in self.fits.
         It also prints to the terminal the fit paramaters and errors
 
@@ -245,26 +821,56 @@ class PlotData(object):
         ----------
         deg : int, optional
             The degree of the polynomial to be fit.
+        batch : bool, optional
+            fit all series sharing the same x data in a single least squares solve, which is
+            much faster for many series of the same length
+        verbose : bool, optional
+            print the fit paramaters and errors
+
+        Returns
+        -------
+        z : array
+            (n series, deg+1) array of the polynomial coefficients, highest power first
+        cov : array
+            (n series, deg+1, deg+1) array of the covariance matrices
         """
-        for data in self.yset:
-            z, cov = np.polyfit(data[0], data[1], cov=True, deg=deg)
-            try:
-                if deg==1:
-                    print('y=m*x+c, (m, c): ',z, '(dc, dm): ',np.sqrt(np.diag(cov)))
-                else:
-                    print(z, np.sqrt(np.diag(cov)))
-            except:
-                print(z)
-            span = max(data[0]-min(data[0]))
-            x = np.arange(min(data[0])-span/12.0, max(data[0])+span/12.0, span/100)
-            y = np.poly1d(z)
-            self.fits.append([x, y(x), z, cov])
+        if batch and isinstance(self.yset, SeriesBlock):
+            fitted = [None]*len(self.yset)
+            for x, ys, members in self.yset.groups():
+                z, cov = np.polyfit(np.asarray(x, dtype=float), ys.T, cov=True, deg=deg)
+                for k, i in enumerate(members):
+                    fitted[i] = (z[:, k], cov[:, :, k])
+        elif batch:
+            fitted = [None]*len(self.yset)
+            for members in _shared_x(self.yset):
+                x = np.asarray(self.yset[members[0]][0], dtype=float)
+                ys = np.column_stack([np.asarray(self.yset[i][1], dtype=float) for i in members])
+                # np.polyfit fits each column of ys against one Vandermonde matrix
+                z, cov = np.polyfit(x, ys, cov=True, deg=deg)
+                for k, i in enumerate(members):
+                    fitted[i] = (z[:, k], cov[:, :, k])
+        else:
+            fitted = [np.polyfit(data[0], data[1], cov=True, deg=deg) for data in self.yset]
+        for data, (z, cov) in zip(self.yset, fitted):
+            if verbose:
+                try:
+                    if deg==1:
+                        print('y=m*x+c, (m, c): ',z, '(dc, dm): ',np.sqrt(np.diag(cov)))
+                    else:
+                        print(z, np.sqrt(np.diag(cov)))
+                except:
+                    print(z)
+            self.fits.append(_fit_line(data, z, cov))
+        deg = max(int(deg), 0)
+        return (np.array([z for z, cov in fitted]).reshape(-1, deg+1),
+                np.array([cov for z, cov in fitted]).reshape(-1, deg+1, deg+1))
 
     def smooth(self, window_len=5, window='blackman'):
         """smooth all of the yset data. Window length must be an odd number. By default it uses
         the blackman window which is 0 on the end. That means a value of window_len = 5 or greater
         is required to actualy do some smoothing. This removes the pointer to the original data
-        and replaces it with numpy arrays of the smoothed data
+        and replaces it with numpy arrays of the smoothed data. A compacted yset is smoothed in
+        place
 
         Parameters
         ----------
@@ -275,8 +881,266 @@ class PlotData(object):
             the type of window from 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'
             flat window will produce a moving average smoothing. default is blackman
         """
-        for data in self.yset:
-            data[1] = smooth(data[1], window_len=window_len, window=window)
+        if isinstance(self.yset, SeriesBlock):
+            for x, ys, members in self.yset.groups():
+                ys[:] = smooth(ys, window_len=window_len, window=window)
+            return
+        lengths = {}
+        for i, data in enumerate(self.yset):
+            lengths.setdefault(len(data[1]), []).append(i)
+        # smooth the series of equal length together as one 2-D array
+        for members in lengths.values():
+            stacked = np.vstack([np.asarray(self.yset[i][1], dtype=float) for i in members])
+            smoothed = smooth(stacked, window_len=window_len, window=window)
+            for i, row in zip(members, smoothed):
+                self.yset[i][1] = row
+
+
+def _shared_x(yset):
+    """Group the series of a yset by their x data
+
+    Parameters
+    ----------
+    yset : list
+        list of data like [[x1array, y1array], [x2array, y2array].....]
+
+    Returns
+    -------
+    list of lists
+        positions in yset of the series sharing the same x data
+    """
+    groups = []
+    for i, data in enumerate(yset):
+        for members in groups:
+            x = yset[members[0]][0]
+            if x is data[0] or (len(x) == len(data[0]) and
+                                np.array_equal(np.asarray(x), np.asarray(data[0]))):
+                members.append(i)
+                break
+        else:
+            groups.append([i])
+    return groups
+
+
+def _append_rows(columns, length, rows):
+    """Write the rows of a DataFrame after the first length rows of the column arrays of
+    PlotData.update. A column that is full, or can't hold the new values, is copied to one with
+    twice the room
+
+    Returns
+    -------
+    list of arrays
+        the columns, new arrays for those that had to grow
+    """
+    needed = length+len(rows)
+    grown = []
+    for column, i in zip(columns, range(rows.shape[1])):
+        values = rows.iloc[:, i].to_numpy()
+        dtype = np.result_type(column.dtype, values.dtype)
+        if needed > len(column) or dtype != column.dtype:
+            bigger = np.empty(max(needed, 2*len(column), 1024), dtype=dtype)
+            bigger[:length] = column[:length]
+            column = bigger
+        column[length:needed] = values
+        grown.append(column)
+    return grown
+
+
+def _fit_line(data, z, cov):
+    """The [x, y, z, cov] entry of PlotData.fits for a series fitted with coefficients z"""
+    span = max(data[0]-min(data[0]))
+    x = np.arange(min(data[0])-span/12.0, max(data[0])+span/12.0, span/100)
+    y = np.poly1d(z)
+    return [x, y(x), z, cov]
+
+
+def _file_stat(path):
+    """Signature of a file recorded when it is loaded, its size and modification time. The
+    hash is left out so loading never reads a file twice, refresh adds it
+
+    Returns
+    -------
+    tuple
+        (size, mtime in ns, None)
+    """
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns, None)
+
+
+def _file_hash(path):
+    """sha1 hex digest of the contents of a file"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _file_signature(path, previous):
+    """Signature of a file for PlotData.refresh. While the size and modification time match
+    the previous signature the file is unchanged, it is hashed the first time so a later touch
+    that leaves the contents alone can be told apart from a real change. A file whose size or
+    modification time differ is only hashed if there is a previous hash to compare with
+
+    Returns
+    -------
+    tuple
+        (size, mtime in ns, hex digest or None)
+    """
+    signature = _file_stat(path)
+    if signature[:2] == previous[:2]:
+        if previous[2] is None:
+            return signature[:2]+(_file_hash(path),)
+        return previous
+    if previous[2] is None:
+        return signature
+    return signature[:2]+(_file_hash(path),)
+
+
+def _file_changed(previous, signature):
+    """True if the contents of a file have changed between two signatures"""
+    if signature[:2] == previous[:2]:
+        return False
+    return previous[2] is None or signature[2] != previous[2]
+
+
+def _bin_rows(binner, through, ys, smoothed, passed):
+    """Put the smoothed and passed through columns of PlotData.onefile_chunked back in order and
+    bin them"""
+    if len(through) == 0:
+        return
+    values = np.empty((len(through), len(smoothed)+len(passed)))
+    values[:, smoothed] = ys.reshape(len(through), -1)
+    values[:, passed] = through[:, 1:]
+    binner.feed(through[:, 0], values)
+
+
+def _read_job(job):
+    """Read one (path, header, kwargs, cache, fallback) job. Kept at module level so it can be
+    sent to a process pool. If the file can't be parsed with kwargs it is parsed again with the
+    fallback kwargs, when there are some. Returns the file signature and the frame"""
+    path, header, kwargs, cache, fallback = job
+    # the signature is taken first, so a file written while it is read looks changed
+    signature = _file_stat(path)
+    try:
+        return signature, read_table(path, header=header, cache=cache, **kwargs)
+    except ValueError:
+        if fallback is None:
+            raise
+        return signature, read_table(path, header=header, cache=cache, **fallback)
+
+
+def _project_columns(read_kwargs, frame_kwargs):
+    """Restrict pandas.read_csv to the columns prepare_frame will use. The selected columns are
+    parsed as float64 and the column positions in frame_kwargs are renumbered to match the
+    projected frame. The header names are kept, so labels are unaffected.
+
+    Parameters
+    ----------
+    read_kwargs : dict
+        arguments for pandas.read_csv
+    frame_kwargs : dict
+        arguments for PlotData.prepare_frame
+
+    Returns
+    -------
+    read_kwargs : dict
+        arguments for pandas.read_csv including usecols and dtype
+    fallback : None or dict
+        arguments to retry with if the columns are not all numeric
+    frame_kwargs : dict
+        arguments for PlotData.prepare_frame with renumbered columns
+    """
+    keys = ['ycols', 'yrcols', 'yr2cols', 'xerrors', 'yerrors']
+    cols = [frame_kwargs.get('xcol', 0)]
+    for key in keys:
+        cols += frame_kwargs.get(key, [])
+    # usecols can't express negative positions, and user given column selections or names
+    # would be changed by the projection, so leave those reads untouched
+    if (min(cols) < 0 or 'usecols' in read_kwargs or 'index_col' in read_kwargs
+            or 'names' in read_kwargs):
+        return read_kwargs, None, frame_kwargs
+    usecols = sorted(set(cols))
+    position = dict((col, i) for i, col in enumerate(usecols))
+    frame_kwargs = dict(frame_kwargs)
+    frame_kwargs['xcol'] = position[cols[0]]
+    for key in keys:
+        if key in frame_kwargs:
+            frame_kwargs[key] = [position[col] for col in frame_kwargs[key]]
+    fallback = dict(read_kwargs, usecols=usecols)
+    if 'dtype' in read_kwargs:
+        return fallback, None, frame_kwargs
+    return dict(fallback, dtype=np.float64), fallback, frame_kwargs
+
+
+# the lists PlotData.refresh splices, each prepare_frame call adds a segment to every one
+_SEGMENT_LISTS = ('files', 'frames', 'yset', 'yrset', 'yr2set', 'yerrors', 'xerrors', 'labels',
+                  'yrlabels', 'yr2labels')
+# the sets PlotData.compact stores in SeriesBlocks
+_COMPACT_SETS = ('yset', 'yrset', 'yr2set', 'yerrors', 'xerrors')
+# windows longer than this are convolved with FFTs
+FFT_WINDOW_LEN = 64
+# cache of normalised windows, keyed by (window, window_len)
+_windows = {}
+
+
+def smoothing_window(window, window_len):
+    """Get a normalised smoothing window. Windows are cached so repeated calls with the same
+    type and length don't rebuild them
+
+    Parameters
+    ----------
+    window : str
+        the type of window from 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'
+    window_len : int
+        the dimension of the smoothing window
+
+    Returns
+    -------
+    array
+        the window scaled to sum to one, treat it as read only
+    """
+    key = (window, window_len)
+    if key not in _windows:
+        if not window in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']:
+            raise ValueError(
+                "Window is not one of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'")
+        if window == 'flat':  # moving average
+            w = np.ones(window_len, 'd')
+        else:
+            w = getattr(np, window)(window_len)
+        w = w/w.sum()
+        w.setflags(write=False)
+        _windows[key] = w
+    return _windows[key]
+
+
+def convolve_valid(s, w):
+    """Convolve each row of s with the window w, keeping only the points where they fully
+    overlap like numpy.convolve(w, s, mode='valid'). Short windows are summed directly, long
+    ones use FFTs
+
+    Parameters
+    ----------
+    s : array
+        1-D signal or 2-D array with one signal per row
+    w : array
+        1-D window
+
+    Returns
+    -------
+    array
+        the convolved signals, len(w)-1 shorter than s along the last axis
+    """
+    n = s.shape[-1]-w.size+1
+    if w.size > FFT_WINDOW_LEN:
+        nfft = s.shape[-1]+w.size-1
+        full = np.fft.irfft(np.fft.rfft(s, nfft)*np.fft.rfft(w, nfft), nfft)
+        return full[..., w.size-1:w.size-1+n]
+    out = np.zeros(s.shape[:-1]+(n,))
+    for k in range(w.size):
+        out += w[k]*s[..., w.size-1-k:w.size-1-k+n]
+    return out
 
 
 def smooth(x, window_len, window):
@@ -285,11 +1149,12 @@ def smooth(x, window_len, window):
     This method is based on the convolution of a scaled window with the signal.
     The signal is prepared by introducing reflected copies of the signal
     (with the window size) in both ends so that transient parts are minimized
-    in the begining and end part of the output signal.
+    in the begining and end part of the output signal. A 2-D array is smoothed row by row
+    in one operation.
 
     input
     -----
-    x: the input signal
+    x: the input signal, or a 2-D array with one signal per row
     window_len: the dimension of the smoothing window; should be an odd integer
     window: the type of window from 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'
         flat window will produce a moving average smoothing.
@@ -311,38 +1176,29 @@ def smooth(x, window_len, window):
 
     Parameters
     ----------
-    x : TYPE
-        Description
-    window_len : TYPE
-        Description
-    window : TYPE
-        Description
+    x : array
+        1-D signal or 2-D array of signals
+    window_len : int
+        the dimension of the smoothing window; should be an odd integer
+    window : str
+        the type of window
 
     Raises
     ------
     ValueError
-    Description
+        for the wrong dimensions, a short signal or unknown window
     """
+    x = np.asarray(x)
+    if x.ndim not in (1, 2):
+        raise ValueError("smooth only accepts 1 or 2 dimension arrays.")
 
-    if x.ndim != 1:
-        raise ValueError("smooth only accepts 1 dimension arrays.")
-
-    if x.size < window_len:
+    if x.shape[-1] < window_len:
         raise ValueError("Input vector needs to be bigger than window size.")
 
     if window_len < 3:
         return x
 
-    if not window in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']:
-        raise ValueError(
-            "Window is not one of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'")
-
-    s = np.r_[x[window_len-1:0:-1], x, x[-1:-window_len:-1]]
-    # print(len(s))
-    if window == 'flat':  # moving average
-        w = np.ones(window_len, 'd')
-    else:
-        w = eval('np.'+window+'(window_len)')
-
-    y = np.convolve(w/w.sum(), s, mode='valid')
-    return y[(window_len/2):-(window_len/2)]
+    w = smoothing_window(window, window_len)
+    s = np.concatenate([x[..., window_len-1:0:-1], x, x[..., -1:-window_len:-1]], axis=-1)
+    y = convolve_valid(s, w)
+    return y[..., (window_len//2):y.shape[-1]-(window_len//2)]
@@ -0,0 +1,335 @@
+"""Readers for the file formats PlotData can load. Text files are parsed with pandas.read_csv,
+the binary columnar formats skip the parsing altogether and only read the columns and rows that
+are asked for:
+
+- Parquet (.parquet, .pq) only reads the row groups overlapping the rows, needs pyarrow
+- Feather / Arrow IPC (.feather, .arrow, .ipc) is memory-mapped and converted without copies
+  where possible, needs pyarrow
+- HDF5 (.h5, .hdf5, .hdf) written by pandas, tables stored with format='table' only read the
+  selected columns, needs pytables
+- NumPy .npy files are memory-mapped, .npz archives only load the selected arrays
+
+Every reader takes the usecols, dtype, skiprows and nrows arguments of pandas.read_csv, with
+usecols as sorted column positions and skiprows as a number of rows.
+"""
+import os
+import numpy as np
+
+FORMATS = {'.csv': 'csv', '.txt': 'csv', '.dat': 'csv',
+           '.parquet': 'parquet', '.pq': 'parquet',
+           '.feather': 'feather', '.arrow': 'feather', '.ipc': 'feather',
+           '.h5': 'hdf', '.hdf5': 'hdf', '.hdf': 'hdf',
+           '.npz': 'npz', '.npy': 'npy'}
+
+
+def table_format(path, format=None):
+    """Work out the format of a file from its extension, unknown extensions are read as text
+
+    Parameters
+    ----------
+    path : str
+    format : None or str, optional
+        one of 'csv', 'parquet', 'feather', 'hdf', 'npz' or 'npy' to override the extension
+
+    Returns
+    -------
+    str
+    """
+    if format is not None:
+        if format not in READERS:
+            raise ValueError('Unknown format %r, options are: %s'
+                             % (format, ', '.join(sorted(READERS))))
+        return format
+    return FORMATS.get(os.path.splitext(path)[1].lower(), 'csv')
+
+
+def read_table(path, header=0, format=None, cache=None, **kwargs):
+    """Read a file into a DataFrame with the reader for its format
+
+    Parameters
+    ----------
+    path : str
+    header : int, optional
+        row of the column names of a text file, ignored by the binary formats
+    format : None or str, optional
+        override the format worked out from the extension, see table_format
+    cache : None or FrameCache, optional
+        cache used for text files, the binary formats are fast enough to read directly
+    **kwargs :
+        passed to pandas.read_csv for text files, or the reader of the format
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    format = table_format(path, format)
+    if format == 'csv':
+        if cache is not None:
+            return cache.read_csv(path, header=header, **kwargs)
+        import pandas as pd
+        return pd.read_csv(path, header=header, **kwargs)
+    return READERS[format](path, **kwargs)
+
+
+def _row_range(nrows_total, skiprows=None, nrows=None):
+    """Turn skiprows and nrows into a (start, stop) row range"""
+    if skiprows is None:
+        skiprows = 0
+    elif not isinstance(skiprows, (int, np.integer)):
+        raise TypeError('skiprows has to be a number of rows for binary formats')
+    start = min(int(skiprows), nrows_total)
+    stop = nrows_total if nrows is None else min(start+int(nrows), nrows_total)
+    return start, stop
+
+
+def _finish(frame, dtype):
+    """Cast the read columns, a ValueError for non numeric data lets PlotData retry without"""
+    if dtype is not None:
+        frame = frame.astype(dtype)
+    return frame
+
+
+def _frame(names, columns, dtype=None):
+    """Make a DataFrame of 1-D arrays without copying them"""
+    import pandas as pd
+    frame = pd.DataFrame(dict(zip(range(len(names)), columns)), copy=False)
+    frame.columns = names
+    return _finish(frame, dtype)
+
+
+def _data_columns(schema):
+    """Column names of an arrow schema, leaving out the stored pandas index"""
+    metadata = schema.pandas_metadata or {}
+    index = set(name for name in metadata.get('index_columns', []) if isinstance(name, str))
+    return [name for name in schema.names if name not in index]
+
+
+def _arrow_frame(table):
+    """Convert an arrow table, splitting the blocks lets single chunk columns be zero-copy"""
+    return table.to_pandas(split_blocks=True)
+
+
+def read_parquet(path, usecols=None, dtype=None, skiprows=None, nrows=None, **kwargs):
+    """Read a Parquet file, only the row groups holding the requested rows are read
+
+    Parameters
+    ----------
+    path : str
+    usecols : None or list of int, optional
+        sorted positions of the columns to read
+    dtype : optional
+        type to cast the columns to
+    skiprows : None or int, optional
+        number of rows to skip at the start
+    nrows : None or int, optional
+        number of rows to read
+    **kwargs :
+        passed to pyarrow.parquet.ParquetFile.read_row_groups
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    import pyarrow.parquet as pq
+    parquet = pq.ParquetFile(path, memory_map=True)
+    columns = _data_columns(parquet.schema_arrow)
+    if usecols is not None:
+        columns = [columns[i] for i in usecols]
+    start, stop = _row_range(parquet.metadata.num_rows, skiprows, nrows)
+    groups = []
+    first = row = 0
+    for i in range(parquet.num_row_groups):
+        length = parquet.metadata.row_group(i).num_rows
+        if row < stop and row+length > start:
+            if not groups:
+                first = row
+            groups.append(i)
+        row += length
+    if groups:
+        table = parquet.read_row_groups(groups, columns=columns, **kwargs)
+        table = table.slice(start-first, stop-start)
+    else:
+        table = parquet.schema_arrow.empty_table().select(columns)
+    return _finish(_arrow_frame(table), dtype)
+
+
+def read_feather(path, usecols=None, dtype=None, skiprows=None, nrows=None):
+    """Read a Feather / Arrow IPC file. The file is memory-mapped and only the record batches
+    holding the requested rows are touched
+
+    Parameters
+    ----------
+    path : str
+    usecols : None or list of int, optional
+        sorted positions of the columns to read
+    dtype : optional
+        type to cast the columns to
+    skiprows : None or int, optional
+        number of rows to skip at the start
+    nrows : None or int, optional
+        number of rows to read
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    import pyarrow as pa
+    import pyarrow.ipc
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(path))
+    except pa.ArrowInvalid:
+        # version 1 feather files are not IPC files
+        import pyarrow.feather
+        table = pyarrow.feather.read_table(path, columns=usecols)
+        start, stop = _row_range(table.num_rows, skiprows, nrows)
+        return _finish(_arrow_frame(table.slice(start, stop-start)), dtype)
+    names = _data_columns(reader.schema)
+    columns = [reader.schema.get_field_index(name) for name in names]
+    if usecols is not None:
+        columns = [columns[i] for i in usecols]
+    lengths = [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+    start, stop = _row_range(sum(lengths), skiprows, nrows)
+    batches = []
+    row = 0
+    for i, length in enumerate(lengths):
+        if row < stop and row+length > start:
+            batch = reader.get_batch(i).select(columns)
+            batches.append(batch.slice(max(start-row, 0), min(stop, row+length)-max(start, row)))
+        row += length
+    schema = pa.schema([reader.schema.field(i) for i in columns])
+    return _finish(_arrow_frame(pa.Table.from_batches(batches, schema=schema)), dtype)
+
+
+def read_hdf(path, usecols=None, dtype=None, skiprows=None, nrows=None, key=None, **kwargs):
+    """Read a DataFrame from a pandas HDF5 file. Tables stored with format='table' only read
+    the requested columns, the fixed format is read whole and then selected
+
+    Parameters
+    ----------
+    path : str
+    usecols : None or list of int, optional
+        sorted positions of the columns to read
+    dtype : optional
+        type to cast the columns to
+    skiprows : None or int, optional
+        number of rows to skip at the start
+    nrows : None or int, optional
+        number of rows to read
+    key : None or str, optional
+        the group to read, can be left out if the file holds only one
+    **kwargs :
+        passed to pandas.HDFStore.select
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    import pandas as pd
+    with pd.HDFStore(path, mode='r') as store:
+        if key is None:
+            keys = store.keys()
+            if len(keys) != 1:
+                raise ValueError('%s holds %d groups, choose one with key=, they are: %s'
+                                 % (path, len(keys), ', '.join(keys)))
+            key = keys[0]
+        storer = store.get_storer(key)
+        if storer.is_table:
+            start, stop = _row_range(storer.nrows, skiprows, nrows)
+            columns = None
+            if usecols is not None:
+                names = list(storer.non_index_axes[0][1])
+                columns = [names[i] for i in usecols]
+            return _finish(store.select(key, columns=columns, start=start, stop=stop,
+                                        **kwargs), dtype)
+        frame = store.select(key, **kwargs)
+    start, stop = _row_range(len(frame), skiprows, nrows)
+    frame = frame.iloc[start:stop]
+    if usecols is not None:
+        frame = frame.iloc[:, usecols]
+    return _finish(frame, dtype)
+
+
+def read_npy(path, usecols=None, dtype=None, skiprows=None, nrows=None):
+    """Read a .npy file, memory-mapped. The fields of a structured array are the columns,
+    otherwise the columns of a 2-D array are named by their position
+
+    Parameters
+    ----------
+    path : str
+    usecols : None or list of int, optional
+        sorted positions of the columns to read
+    dtype : optional
+        type to cast the columns to
+    skiprows : None or int, optional
+        number of rows to skip at the start
+    nrows : None or int, optional
+        number of rows to read
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    array = np.load(path, mmap_mode='r')
+    start, stop = _row_range(len(array), skiprows, nrows)
+    array = array[start:stop]
+    if array.dtype.names is not None:
+        names = list(array.dtype.names)
+        columns = [array[name] for name in names]
+    elif array.ndim == 1:
+        names = [0]
+        columns = [array]
+    elif array.ndim == 2:
+        names = list(range(array.shape[1]))
+        columns = [array[:, i] for i in names]
+    else:
+        raise ValueError('%s holds a %d-D array, only 1-D and 2-D arrays can be read'
+                         % (path, array.ndim))
+    if usecols is not None:
+        names = [names[i] for i in usecols]
+        columns = [columns[i] for i in usecols]
+    return _frame(names, columns, dtype)
+
+
+def read_npz(path, usecols=None, dtype=None, skiprows=None, nrows=None):
+    """Read a .npz archive. Each 1-D array is a column named by its key, in the order they were
+    saved, and only the selected arrays are loaded. An archive of a single 2-D array is read
+    like a .npy file
+
+    Parameters
+    ----------
+    path : str
+    usecols : None or list of int, optional
+        sorted positions of the columns to read
+    dtype : optional
+        type to cast the columns to
+    skiprows : None or int, optional
+        number of rows to skip at the start
+    nrows : None or int, optional
+        number of rows to read
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    with np.load(path) as archive:
+        names = list(archive.files)
+        if len(names) == 1 and archive[names[0]].ndim == 2:
+            array = archive[names[0]]
+            names = list(range(array.shape[1]))
+            columns = [array[:, i] for i in names]
+        else:
+            if usecols is not None:
+                names = [names[i] for i in usecols]
+                usecols = None
+            columns = [archive[name] for name in names]
+    if columns:
+        start, stop = _row_range(len(columns[0]), skiprows, nrows)
+        columns = [column[start:stop] for column in columns]
+    if usecols is not None:
+        names = [names[i] for i in usecols]
+        columns = [columns[i] for i in usecols]
+    return _frame(names, columns, dtype)
+
+
+READERS = {'csv': None, 'parquet': read_parquet, 'feather': read_feather, 'hdf': read_hdf,
+           'npz': read_npz, 'npy': read_npy}
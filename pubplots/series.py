@@ -0,0 +1,169 @@
+"""Contains the SeriesBlock class, a compact store for the series of a PlotData set. See
+PlotData.compact
+"""
+import numpy as np
+
+
+class SeriesBlock(object):
+
+    """All the series of a set like PlotData.yset in one contiguous float64 buffer. Series sharing
+    the same x data are stored next to each other, so each group is a 2-D (series, points) block
+    with one x array, and an offset table locates every series in the buffer.
+
+    It behaves like the list of [x, y] pairs it replaces: len(), iteration and indexing work and
+    block[i] is a view with block[i][0] the shared x array and block[i][1] the y values. Assigning
+    to block[i][1] writes the new values into the buffer, so they have to be the same length.
+    Comparing with a list compares the series, so plotdata.yr2set == [] still works.
+
+    Attributes
+    ----------
+    data : numpy.ndarray
+        1-D buffer of the y values of every series
+    offsets : numpy.ndarray
+        start of each series in data, in the original order of the series
+    lengths : numpy.ndarray
+        number of points of each series
+    xs : list of numpy.ndarray
+        the distinct x arrays
+    xindex : numpy.ndarray
+        position in xs of the x array of each series
+    """
+
+    def __init__(self, yset):
+        """
+        Parameters
+        ----------
+        yset : list
+            list of data like [[x1array, y1array], [x2array, y2array].....]
+        """
+        # imported here as plotdata imports this module
+        from pubplots.plotdata import _shared_x
+        groups = _shared_x(yset)
+        self.xs = [np.asarray(yset[members[0]][0]) for members in groups]
+        self.xindex = np.empty(len(yset), dtype=np.intp)
+        self.offsets = np.empty(len(yset), dtype=np.intp)
+        self.lengths = np.empty(len(yset), dtype=np.intp)
+        self._groups = []
+        self.data = np.empty(sum(len(data[1]) for data in yset), dtype=np.float64)
+        start = 0
+        for k, members in enumerate(groups):
+            length = len(self.xs[k])
+            stop = start+length*len(members)
+            block = self.data[start:stop].reshape(len(members), length)
+            for row, i in enumerate(members):
+                y = np.asarray(yset[i][1], dtype=np.float64)
+                if len(y) != length:
+                    raise ValueError('Series %d has %d y values for %d x values'
+                                     % (i, len(y), length))
+                block[row] = y
+                self.xindex[i] = k
+                self.offsets[i] = start+row*length
+                self.lengths[i] = length
+            self._groups.append((members, block))
+            start = stop
+
+    def groups(self):
+        """The series sharing the same x data
+
+        Returns
+        -------
+        list of (x, Y, members) tuples
+            the x array, the writable (series, points) view of their y values and the
+            positions of the series in the set
+        """
+        return [(self.xs[k], block, members) for k, (members, block) in enumerate(self._groups)]
+
+    def y(self, i):
+        """Writable view of the y values of series i"""
+        return self.data[self.offsets[i]:self.offsets[i]+self.lengths[i]]
+
+    def nbytes(self):
+        """Memory used by the block in bytes"""
+        return (self.data.nbytes+self.offsets.nbytes+self.lengths.nbytes+self.xindex.nbytes+
+                sum(x.nbytes for x in self.xs))
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [_SeriesView(self, j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('series index out of range')
+        return _SeriesView(self, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield _SeriesView(self, i)
+
+    def __eq__(self, other):
+        try:
+            if len(self) != len(other):
+                return False
+        except TypeError:
+            return NotImplemented
+        return all(_pair_equal(a, b) for a, b in zip(self, other))
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<SeriesBlock of %d series in %d x groups>' % (len(self), len(self.xs))
+
+
+class _SeriesView(object):
+
+    """One [x, y] pair of a SeriesBlock"""
+
+    def __init__(self, block, i):
+        self.block = block
+        self.i = i
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, k):
+        if k in (0, -2):
+            return self.block.xs[self.block.xindex[self.i]]
+        if k in (1, -1):
+            return self.block.y(self.i)
+        raise IndexError('a series is an [x, y] pair')
+
+    def __setitem__(self, k, values):
+        if k not in (1, -1):
+            raise TypeError('only the y values of a compacted series can be changed')
+        y = self.block.y(self.i)
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape != y.shape:
+            raise ValueError('Can not change the length of a compacted series from %d to %d'
+                             % (len(y), len(values)))
+        y[:] = values
+
+    def __iter__(self):
+        yield self[0]
+        yield self[1]
+
+    def __eq__(self, other):
+        return _pair_equal(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr([self[0], self[1]])
+
+
+def _pair_equal(a, b):
+    """Compare two [x, y] pairs by value"""
+    try:
+        return (len(a) == len(b) == 2 and
+                all(np.array_equal(np.asarray(u), np.asarray(v)) for u, v in zip(a, b)))
+    except TypeError:
+        return False
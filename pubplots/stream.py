@@ -0,0 +1,278 @@
+"""Reduce data that arrives in chunks, like a csv file too large to load, with bounded memory.
+StreamSmoother applies the smooth window across chunk boundaries and StreamBinner reduces the
+rows to a fixed number of bins whatever the length of the data. See PlotData.onefile_chunked
+"""
+import numpy as np
+from pubplots.plotdata import smoothing_window, convolve_valid
+
+
+class StreamSmoother(object):
+
+    """Smooth columns that arrive in chunks of rows, giving the same result as
+    pubplots.plotdata.smooth on each whole column. The rows needed by the next chunk, and the
+    x values of rows that are not smoothed yet, are carried over, so at most window_len-1 rows
+    are held back.
+
+    example
+    -------
+    smoother = StreamSmoother(11, 'blackman')
+    for x, ys in chunks:
+        x, ys = smoother.feed(x, ys)
+        ...
+    x, ys = smoother.finish()
+    """
+
+    def __init__(self, window_len, window='blackman'):
+        """
+        Parameters
+        ----------
+        window_len : int
+            the dimension of the smoothing window; should be an odd integer
+        window : str, optional
+            the type of window from 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'
+        """
+        self.window_len = window_len
+        self.w = smoothing_window(window, window_len) if window_len >= 3 else None
+        self.rows = 0
+        self.emitted = 0
+        self.skip = window_len//2
+        # the leading rows until the start can be reflected, then the last window_len-1 rows
+        # of the padded signal
+        self.tail = None
+        self.started = False
+        self.x = None
+
+    def _convolve(self, s):
+        """Smooth the padded rows s, dropping the outputs before the first row"""
+        ys = convolve_valid(s.T, self.w).T
+        drop = min(self.skip, len(ys))
+        self.skip -= drop
+        self.tail = s[len(s)-(self.window_len-1):]
+        return ys[drop:]
+
+    def _emit(self, ys):
+        """Pair smoothed rows with their held back x values"""
+        x = self.x[:len(ys)]
+        self.x = self.x[len(ys):]
+        self.emitted += len(ys)
+        return x, ys
+
+    def feed(self, x, ys):
+        """Smooth a chunk of rows
+
+        Parameters
+        ----------
+        x : array
+            (rows,) or (rows, columns) values passed through unsmoothed, like the x values
+        ys : array
+            (rows, columns) values to smooth
+
+        Returns
+        -------
+        x, ys : arrays
+            the rows that could be smoothed so far, they lag behind the input
+        """
+        ys = np.asarray(ys, dtype=float).reshape(len(x), -1)
+        if self.w is None:
+            self.rows += len(x)
+            self.emitted += len(x)
+            return np.asarray(x), ys
+        self.x = np.asarray(x) if self.x is None else np.concatenate([self.x, x])
+        self.rows += len(x)
+        if not self.started:
+            self.tail = ys if self.tail is None else np.concatenate([self.tail, ys])
+            if len(self.tail) < self.window_len:
+                return self._emit(ys[:0])
+            self.started = True
+            # reflect the start, like smooth does
+            s = np.concatenate([self.tail[self.window_len-1:0:-1], self.tail])
+        else:
+            s = np.concatenate([self.tail, ys])
+        return self._emit(self._convolve(s))
+
+    def finish(self):
+        """Smooth the rows held back at the end of the data
+
+        Returns
+        -------
+        x, ys : arrays
+            the last rows
+
+        Raises
+        ------
+        ValueError
+            if there were fewer rows than the window length
+        """
+        if self.w is None or self.rows == 0:
+            return np.zeros(0), np.zeros((0, 0))
+        if not self.started:
+            raise ValueError("Input vector needs to be bigger than window size.")
+        # the end is reflected starting from the last row, like smooth does
+        s = np.concatenate([self.tail, self.tail[::-1]])
+        ys = self._convolve(s)
+        # an even window_len gives one row less, as smooth does
+        total = self.rows+self.window_len-1-2*(self.window_len//2)
+        return self._emit(ys[:total-self.emitted])
+
+
+class StreamBinner(object):
+
+    """Reduce rows sorted by x to at most 2*points bins with bounded memory. Each bin covers
+    stride consecutive rows, when there are too many bins neighbouring bins are merged and the
+    stride doubles, so the rows end up in between points and 2*points bins.
+
+    Attributes
+    ----------
+    reduce : str
+        'mean' averages x and each column over a bin, ignoring NaNs. 'minmax' keeps the
+        minimum and maximum of each column as two rows per bin, at the first and last x of the
+        bin in the order they occurred, so peaks survive. 'decimate' keeps the first row of
+        each bin
+    stride : int
+        rows per bin
+    """
+
+    def __init__(self, points=5000, reduce='mean'):
+        """
+        Parameters
+        ----------
+        points : int, optional
+            least number of bins to reduce the rows to
+        reduce : str, optional
+            'mean', 'minmax' or 'decimate'
+        """
+        if reduce not in ('mean', 'minmax', 'decimate'):
+            raise ValueError("reduce must be one of 'mean', 'minmax' or 'decimate'")
+        self.reduce = reduce
+        self.max_bins = 2*max(int(points), 1)
+        self.stride = 1
+        self.rows = 0
+        self.bins = None
+        self.partial = None
+
+    def _bins(self, x, ys, size):
+        """Reduce rows to bins of size consecutive rows, the rows have to fill the bins"""
+        n = len(x)//size
+        if self.reduce == 'decimate':
+            return {'count': np.full(n, size), 'x': x[::size][:n], 'y': ys[::size][:n]}
+        shape = (n, size)+ys.shape[1:]
+        grouped = ys.reshape(shape)
+        if self.reduce == 'mean':
+            finite = ~np.isnan(grouped)
+            return {'count': np.full(n, size), 'x': x.reshape(n, size).sum(axis=1),
+                    'y': np.where(finite, grouped, 0.0).sum(axis=1),
+                    'ny': finite.sum(axis=1)}
+        # an all NaN bin has no extremes, its argmin and argmax are 0
+        filled = np.where(np.isnan(grouped), np.inf, grouped)
+        imin = filled.argmin(axis=1)
+        filled = np.where(np.isnan(grouped), -np.inf, grouped)
+        imax = filled.argmax(axis=1)
+        start = self.rows+np.arange(n)*size
+        return {'count': np.full(n, size), 'first': x[::size][:n],
+                'last': x[size-1::size][:n],
+                'min': np.take_along_axis(grouped, imin[:, None], axis=1)[:, 0],
+                'max': np.take_along_axis(grouped, imax[:, None], axis=1)[:, 0],
+                'imin': start[:, None]+imin, 'imax': start[:, None]+imax}
+
+    def _merge(self, a, b):
+        """Merge bins a with the bins b that follow them"""
+        merged = {'count': a['count']+b['count']}
+        if self.reduce == 'decimate':
+            merged.update(x=a['x'], y=a['y'])
+        elif self.reduce == 'mean':
+            merged.update(x=a['x']+b['x'], y=a['y']+b['y'], ny=a['ny']+b['ny'])
+        else:
+            merged.update(first=a['first'], last=b['last'])
+            # ties and NaNs keep the earlier extreme
+            lower = ~(b['min'] < a['min']) & ~np.isnan(a['min'])
+            higher = ~(b['max'] > a['max']) & ~np.isnan(a['max'])
+            merged.update(min=np.where(lower, a['min'], b['min']),
+                          imin=np.where(lower, a['imin'], b['imin']),
+                          max=np.where(higher, a['max'], b['max']),
+                          imax=np.where(higher, a['imax'], b['imax']))
+        return merged
+
+    def _halve(self):
+        """Merge neighbouring bins, doubling the stride. An odd last bin joins the partial bin"""
+        if self.bins is None:
+            self.stride *= 2
+            return
+        n = len(self.bins['count'])
+        if n % 2:
+            last = dict((key, value[n-1:]) for key, value in self.bins.items())
+            self.partial = last if self.partial is None else self._merge(last, self.partial)
+            n -= 1
+        even = dict((key, value[0:n:2]) for key, value in self.bins.items())
+        odd = dict((key, value[1:n:2]) for key, value in self.bins.items())
+        self.bins = self._merge(even, odd)
+        self.stride *= 2
+
+    def _append(self, bins):
+        if self.bins is None:
+            self.bins = bins
+        else:
+            self.bins = dict((key, np.concatenate([self.bins[key], bins[key]]))
+                             for key in self.bins)
+
+    def feed(self, x, ys):
+        """Add a chunk of rows
+
+        Parameters
+        ----------
+        x : array
+            (rows,) x values, ascending
+        ys : array
+            (rows, columns) values
+        """
+        x = np.asarray(x, dtype=float)
+        ys = np.asarray(ys, dtype=float).reshape(len(x), -1)
+        held = 0 if self.partial is None else self.partial['count'][0]
+        # widen the bins first so the chunk never makes more than max_bins of them
+        while (0 if self.bins is None else len(self.bins['count'])) + \
+                (held+len(x))//self.stride > self.max_bins:
+            self._halve()
+            held = 0 if self.partial is None else self.partial['count'][0]
+        if held:
+            take = min(self.stride-held, len(x))
+            self.partial = self._merge(self.partial, self._bins(x[:take], ys[:take], take))
+            self.rows += take
+            x, ys = x[take:], ys[take:]
+            if self.partial['count'][0] == self.stride:
+                self._append(self.partial)
+                self.partial = None
+        full = len(x)//self.stride*self.stride
+        if full:
+            self._append(self._bins(x[:full], ys[:full], self.stride))
+            self.rows += full
+        if full < len(x):
+            self.partial = self._bins(x[full:], ys[full:], len(x)-full)
+            self.rows += len(x)-full
+
+    def result(self):
+        """The reduced rows
+
+        Returns
+        -------
+        x, ys : arrays
+            (bins,) x values and (bins, columns) values, 'minmax' gives two rows per bin
+        """
+        bins = self.bins
+        if self.partial is not None:
+            bins = self.partial if bins is None else dict(
+                (key, np.concatenate([bins[key], self.partial[key]])) for key in bins)
+        if bins is None:
+            return np.zeros(0), np.zeros((0, 0))
+        if self.reduce == 'decimate':
+            return bins['x'], bins['y']
+        if self.reduce == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return bins['x']/bins['count'], bins['y']/bins['ny']
+        n = len(bins['count'])
+        x = np.empty(2*n)
+        x[0::2] = bins['first']
+        x[1::2] = bins['last']
+        ys = np.empty((2*n,)+bins['min'].shape[1:])
+        early = bins['imin'] <= bins['imax']
+        ys[0::2] = np.where(early, bins['min'], bins['max'])
+        ys[1::2] = np.where(early, bins['max'], bins['min'])
+        return x, ys
@@ -0,0 +1,150 @@
+"""Contains the FigureTemplate class, which builds a styled figure once and redraws it with new
+data, for batches of plots that share one layout
+"""
+from pubplots import plot as pbt
+
+# the sets of a PlotData object, their labels and axis labels, for the main axes and the right
+# hand axes r1 and r2 made by the quick plot methods
+_SETS = (('yset', 'labels', 'yaxislabel'), ('yrset', 'yrlabels', 'yraxislabel'),
+         ('yr2set', 'yr2labels', 'yr2axislabel'))
+
+
+class FigureTemplate(object):
+
+    """A figure drawn once by a quick plot method, whose lines are then given the data of other
+    PlotData objects. The style, twin axes, ticks and spines are only made once, each update
+    replaces the line data, the axis labels and the line labels, and rescales the axes. The
+    PlotData objects have to hold the same number of series in each set as the one the template
+    was built from.
+
+    Series drawn as collections or density maps can't be updated, build the template without
+    collection=True and with few enough points for markers.
+
+    example
+    -------
+    template = FigureTemplate(plotdatas[0], style='modern', options={'scatter': True})
+    for i, plotdata in enumerate(plotdatas):
+        template.update(plotdata)
+        template.save('plot%d' % i)
+
+    Attributes
+    ----------
+    fig : matplotlib.figure.Figure
+    ax : matplotlib.axes object
+        the main axes
+    r1, r2 : matplotlib.axes objects or None
+        the right hand axes
+    """
+
+    def __init__(self, plotdata, style='modern', options={}, figsize=(8, 6)):
+        """
+        Parameters
+        ----------
+        plotdata : PlotData object
+            data to build the figure with, it sets the layout
+        style : str, optional
+            one of 'modern', 'semimodern' or 'oldhat'
+        options : dict, optional
+            passed to the quick plot method
+        figsize : tuple, optional
+            (width, height) in inches
+        """
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        # imported here as batch imports this module
+        from pubplots.batch import STYLES
+        try:
+            quick = STYLES[style]
+        except KeyError:
+            raise ValueError('Incorrect style options are: "modern", "semimodern" and "oldhat"')
+        self.options = dict(options)
+        self.fig = Figure(figsize=figsize, facecolor='white')
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot(111)
+        self.r1, self.r2 = quick(self.ax, plotdata, **self.options)
+        self._parts = []
+        for axes, (setname, labelname, axislabel) in zip((self.ax, self.r1, self.r2), _SETS):
+            yset = getattr(plotdata, setname)
+            if axes is None:
+                if len(yset):
+                    raise ValueError('%s was not plotted' % setname)
+                continue
+            lines = [line for line in axes.lines if not line.get_label().startswith('_')
+                     and not getattr(line, 'pubplots_stand_in', False)]
+            if len(lines) != len(yset):
+                raise ValueError('%s was not drawn as one line per series, so it can not be '
+                                 'updated. Build the template without collection=True and with '
+                                 'fewer points than density_above' % setname)
+            self._parts.append({'axes': axes, 'set': setname, 'labels': labelname,
+                                'axislabel': axislabel, 'lines': lines,
+                                'texts': list(axes.texts)})
+        self.counts = self.shape(plotdata)
+
+    @staticmethod
+    def shape(plotdata):
+        """The number of series in each set, templates can only take data of the same shape
+
+        Returns
+        -------
+        tuple of int
+        """
+        return tuple(len(getattr(plotdata, setname)) for setname, _, _ in _SETS)
+
+    def update(self, plotdata):
+        """Replace the data and labels of the figure with those of plotdata
+
+        Parameters
+        ----------
+        plotdata : PlotData object
+            with the same number of series in each set as the template
+
+        Raises
+        ------
+        ValueError
+            if plotdata holds a different number of series
+        """
+        counts = self.shape(plotdata)
+        if counts != self.counts:
+            raise ValueError('The template was built for %s series in yset, yrset and yr2set, '
+                             'got %s' % (self.counts, counts))
+        decimate = self.options.get('decimate', False)
+        for part in self._parts:
+            axes = part['axes']
+            yset = getattr(plotdata, part['set'])
+            width = pbt.axes_pixels(axes) if decimate is True else decimate
+            for line, data in zip(part['lines'], yset):
+                x, y = data[0], data[1]
+                if width:
+                    x, y = pbt.minmax_decimate(x, y, width, ax=axes)
+                line.set_data(x, y)
+            axes.relim()
+            axes.autoscale_view()
+        self.ax.set_xlabel(plotdata.xaxislabel)
+        for part in self._parts:
+            part['axes'].set_ylabel(getattr(plotdata, part['axislabel']))
+        # the labels sit on the lines, so they are placed again once every axes is rescaled
+        for part in self._parts:
+            if part['texts']:
+                part['texts'] = self._relabel(part, getattr(plotdata, part['set']),
+                                              getattr(plotdata, part['labels']))
+
+    def _relabel(self, part, yset, labels):
+        """Replace the line labels of an axes, keeping their colors and size"""
+        old = part['texts']
+        for text in old:
+            text.remove()
+        at_x = self.options.get('at_x') if part['axes'] is self.ax else None
+        return pbt.label_lines(part['axes'], yset, at_x=at_x, labels=labels,
+                               colors=[text.get_color() for text in old],
+                               fontsize=old[0].get_fontsize())
+
+    def save(self, name='plot', formats=('png', 'pdf'), dpi=150, outdir='plots', **kwargs):
+        """Save the figure, see pubplots.plot.save_figure
+
+        Returns
+        -------
+        list of str
+            the files written
+        """
+        return pbt.save_figure(self.fig, name=name, formats=formats, dpi=dpi, outdir=outdir,
+                               **kwargs)
@@ -0,0 +1,212 @@
+"""Opt-in timing of the plotting stages. The plot functions are wrapped with timed(), which does
+nothing but check for an active Profile unless one is recording.
+
+example
+-------
+with profile() as prof:
+    quick_modern(ax, plotdata)
+    save('plot')
+print(prof.summary())
+"""
+import functools
+import time
+import tracemalloc
+
+# stack of the recording profiles, the innermost records
+_active = []
+
+
+class Profile(object):
+
+    """Records the wall time, number of points drawn and memory allocated by each stage of
+    making a figure. Use it as a context manager, see profile()
+
+    Attributes
+    ----------
+    records : list of dict
+        one per stage in the order they started, with keys 'stage', 'figure', 'seconds',
+        'points', 'memory' (bytes still allocated at the end of the stage, None unless memory
+        is traced) and 'depth' (nesting level, stages called by other stages are deeper)
+    memory : bool
+        trace memory allocations with tracemalloc
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.records = []
+        self._depth = 0
+        self._figures = {}
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        _active.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _active.remove(self)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def figure_name(self, figure):
+        """Name a figure by its label, or its order of appearance"""
+        if figure is None:
+            return None
+        if id(figure) not in self._figures:
+            label = figure.get_label() if hasattr(figure, 'get_label') else ''
+            self._figures[id(figure)] = label or 'figure %d' % (len(self._figures)+1)
+        return self._figures[id(figure)]
+
+    def report(self):
+        """Breakdown of the recorded stages per figure
+
+        Returns
+        -------
+        dict
+            figure name to a dict with the 'stages' records and the 'seconds' and 'points'
+            totals of the top level stages
+        """
+        figures = {}
+        for record in self.records:
+            entry = figures.setdefault(record['figure'], {'stages': [], 'seconds': 0.0,
+                                                          'points': 0})
+            entry['stages'].append(record)
+            if record['depth'] == 0:
+                entry['seconds'] += record['seconds']
+                entry['points'] += record['points']
+        return figures
+
+    def summary(self):
+        """The report as a table
+
+        Returns
+        -------
+        str
+        """
+        lines = []
+        for figure, entry in self.report().items():
+            lines.append('%s: %.4f s, %d points' % (figure, entry['seconds'], entry['points']))
+            for record in entry['stages']:
+                memory = '' if record['memory'] is None else '%12d B' % record['memory']
+                lines.append('  %-28s %10.4f s %10d pts %s' % (
+                    '  '*record['depth']+record['stage'], record['seconds'],
+                    record['points'], memory))
+        return '\n'.join(lines)
+
+
+class _Stage(object):
+
+    """Times one stage for a Profile"""
+
+    def __init__(self, profile, name, figure, points):
+        self.profile = profile
+        self.record = {'stage': name, 'figure': profile.figure_name(figure),
+                       'points': points, 'memory': None}
+
+    def __enter__(self):
+        self.record['depth'] = self.profile._depth
+        self.profile._depth += 1
+        # reserve the place of the record so stages are listed in the order they started
+        self.profile.records.append(self.record)
+        if self.profile.memory:
+            self.memory = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.record['seconds'] = time.perf_counter()-self.start
+        if self.profile.memory:
+            self.record['memory'] = tracemalloc.get_traced_memory()[0]-self.memory
+        self.profile._depth -= 1
+        return False
+
+
+class _NullStage(object):
+
+    """Stands in for _Stage when nothing is recording"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def profile(memory=False):
+    """Start recording the plotting stages
+
+    Parameters
+    ----------
+    memory : bool, optional
+        also record the memory allocated by each stage, this slows plotting down
+
+    Returns
+    -------
+    Profile
+        use it in a with statement
+    """
+    return Profile(memory=memory)
+
+
+def stage(name, figure=None, points=0):
+    """Time a block of code as a stage of the active profile, if there is one
+
+    Parameters
+    ----------
+    name : str
+    figure : None or matplotlib.figure object, optional
+        the figure the stage works on
+    points : int, optional
+        number of points drawn
+    """
+    if not _active:
+        return _NULL_STAGE
+    return _Stage(_active[-1], name, figure, points)
+
+
+def yset_points(yset):
+    """Number of points in a yset"""
+    try:
+        return sum(len(data[0]) for data in yset)
+    except TypeError:
+        return 0
+
+
+def plotdata_points(plotdata):
+    """Number of points in the sets of a PlotData object"""
+    return (yset_points(plotdata.yset)+yset_points(plotdata.yrset)+
+            yset_points(plotdata.yr2set))
+
+
+def timed(name, points=None):
+    """Decorator recording each call of a plot function as a stage. The first argument of the
+    function has to be an axes or a figure
+
+    Parameters
+    ----------
+    name : str
+    points : None or function, optional
+        counts the points drawn from the second argument of the function
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return function(*args, **kwargs)
+            figure = getattr(args[0], 'figure', args[0]) if args else None
+            count = 0
+            if points is not None:
+                data = args[1] if len(args) > 1 else kwargs.get('yset', kwargs.get('plotdata'))
+                if data is not None:
+                    count = points(data)
+            with _Stage(_active[-1], name, figure, count):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
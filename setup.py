@@ -61,13 +61,13 @@ if __name__ == "__main__":
         version=VERSION,
         download_url=DOWNLOAD_URL,
         install_requires=install_requires,
+        python_requires='>=3.7',
         packages=['pubplots'],
+        entry_points={'console_scripts': ['pubplots=pubplots.cli:main']},
         classifiers=[
                      'Intended Audience :: Science/Research',
-                     'Programming Language :: Python :: 2.7',
-                     'Programming Language :: Python :: 3.3',
-                     'Programming Language :: Python :: 3.4',
-                     'Programming Language :: Python :: 3.5',
+                     'Programming Language :: Python :: 3',
+                     'Programming Language :: Python :: 3 :: Only',
                      'License :: OSI Approved :: BSD License',
                      'Topic :: Scientific/Engineering :: Visualization',
                      'Topic :: Multimedia :: Graphics',
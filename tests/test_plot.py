@@ -0,0 +1,57 @@
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from pubplots.plot import _interp_lines, label_positions, quick_modern
+from pubplots.plotdata import PlotData
+from pubplots.timing import profile
+
+
+def test_interp_lines_matches_np_interp():
+    rng = np.random.RandomState(0)
+    for trial in range(500):
+        n = rng.randint(1, 8)
+        x = np.sort(rng.choice(np.arange(10.0), n))
+        y = rng.normal(size=n)
+        at = rng.uniform(-2, 12, 5)
+        # positions on the points, repeated x included
+        at[:2] = rng.choice(x, 2)
+        np.testing.assert_allclose(_interp_lines([[x, y]], at[None])[0], np.interp(at, x, y),
+                                   atol=1e-15)
+
+
+def test_label_positions_does_not_copy_the_data():
+    x = np.arange(1, 200001, dtype=float)
+    yset = [[x, np.sin(x/1e4)+i] for i in range(5)]
+    fig, ax = plt.subplots()
+    ax.set_xlim(1, 200000)
+    at_x = [10.5, 1000.0, 5e4, 1.5e5, 3e5]
+    tracemalloc.start()
+    try:
+        label_positions(ax, yset, at_x, offsets=[(0, 0)], rotation_on=True)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        plt.close(fig)
+    # a copy of any one line would take x.nbytes
+    assert peak < x.nbytes/4
+
+
+def test_profile_records_quick_modern():
+    plotdata = PlotData()
+    x = np.linspace(0, 10, 50)
+    plotdata.yset = [[x, np.sin(x)], [x, np.cos(x)]]
+    plotdata.labels = ['sin', 'cos']
+    plotdata.xaxislabel = 'x'
+    plotdata.yaxislabel = 'y'
+    fig, ax = plt.subplots()
+    try:
+        with profile() as prof:
+            quick_modern(ax, plotdata)
+    finally:
+        plt.close(fig)
+    stages = [record['stage'] for record in prof.records]
+    assert 'quick_modern' in stages